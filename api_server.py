@@ -1,34 +1,275 @@
 # Flask API Server dla parsowania PDF
 # Serwer API do integracji z aplikacją React/Bolt
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+import asyncio
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
 import os
-import tempfile
+import queue
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import pandas as pd
 from pdf_expense_parser import UniversalPDFParser
 
+try:
+    import orjson  # Szybsza serializacja JSON (opcjonalnie)
+except Exception:
+    orjson = None
+
+try:
+    import pyarrow  # Eksport Parquet/Feather (opcjonalnie)
+except Exception:
+    pyarrow = None
+
 app = Flask(__name__)
 
+# Górny limit rozmiaru uploadu - Werkzeug odrzuca większe żądania (413)
+# zanim multipart trafi do pamięci. Konfigurowalne przez ENV (w MB).
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 32)) * 1024 * 1024
+
+if orjson is not None:
+    from flask.json.provider import DefaultJSONProvider
+
+    class ORJSONProvider(DefaultJSONProvider):
+        """Serializacja odpowiedzi przez orjson - emituje UTF-8 natywnie
+        i obsługuje skalary NumPy z pandas bez dodatkowej konwersji."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(
+                obj,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+            ).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = ORJSONProvider(app)
+
+# Logowanie zamiast print() - poziom sterowany przez ENV, DEBUG domyślnie wyciszony
+log = logging.getLogger(__name__)
+log.setLevel(os.getenv('LOG_LEVEL', 'INFO'))
+
+# Wspólna pula wątków do równoległego parsowania wielu PDF-ów.
+# Limit konfigurowalny przez ENV, żeby nie wyczerpać połączeń do Supabase.
+PARSE_CONCURRENCY = int(os.getenv("PARSE_CONCURRENCY", min(8, (os.cpu_count() or 2) * 2)))
+EXECUTOR = ThreadPoolExecutor(max_workers=PARSE_CONCURRENCY)
+
+# Osobna, mała pula do zapisów w tle (Supabase) - nie blokuje parsowania
+SAVE_CONCURRENCY = int(os.getenv("SAVE_CONCURRENCY", 4))
+_BG = ThreadPoolExecutor(max_workers=SAVE_CONCURRENCY)
+
+def _safe_save(save_fn, payload):
+    """Zapis w tle: wyjątki tylko do logu, odpowiedź już poszła do klienta."""
+    try:
+        save_fn(payload)
+    except Exception as e:
+        log.warning("background Supabase save failed: %s", e)
+
 # --- CORS: czytane z ENV, z sensownym domyślnym zestawem ---
 # USTAW w Render: ALLOWED_ORIGINS="https://bank-statement-conve-ywup.bolt.host,https://statement2sheet.com,http://localhost:3000"
-ALLOWED_ORIGINS = os.getenv(
-    "ALLOWED_ORIGINS",
-    "https://bank-statement-conve-ywup.bolt.host,https://statement2sheet.com,http://localhost:3000"
-).split(",")
-
-# Apply CORS to all routes
-CORS(
-    app,
-    origins=[o.strip() for o in ALLOWED_ORIGINS],
-    supports_credentials=True,
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
+ALLOWED_ORIGINS = frozenset(
+    o.strip()
+    for o in os.getenv(
+        "ALLOWED_ORIGINS",
+        "https://bank-statement-conve-ywup.bolt.host,https://statement2sheet.com,http://localhost:3000"
+    ).split(",")
+    if o.strip()
 )
 
+# Jak długo przeglądarka może cache'ować odpowiedź preflight (OPTIONS)
+CORS_MAX_AGE = int(os.getenv("CORS_MAX_AGE", 86400))
+
+# CORS robione ręcznie zamiast flask_cors: O(1) test przynależności do
+# frozenset na żądanie, bez regexów i hooków biblioteki na gorącej
+# ścieżce (/health jest odpytywany przez load balancer co kilka sekund)
+_CORS_METHODS = 'GET, POST, PUT, DELETE, OPTIONS'
+
+@app.before_request
+def _short_circuit_preflight():
+    """Preflight OPTIONS nie musi przechodzić przez routing - od razu 204.
+
+    Nagłówki CORS dokleja _apply_cors, więc odpowiedź jest kompletna,
+    a przeglądarka cache'uje ją przez CORS_MAX_AGE.
+    """
+    if request.method == 'OPTIONS':
+        return '', 204
+
+@app.after_request
+def _apply_cors(response):
+    origin = request.headers.get('Origin')
+    if origin in ALLOWED_ORIGINS:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.headers.add('Vary', 'Origin')
+        if request.method == 'OPTIONS':
+            response.headers['Access-Control-Allow-Methods'] = _CORS_METHODS
+            response.headers['Access-Control-Allow-Headers'] = request.headers.get(
+                'Access-Control-Request-Headers', '*')
+            response.headers['Access-Control-Max-Age'] = str(CORS_MAX_AGE)
+    return response
+
 parser = UniversalPDFParser()
 
+# Kolumny, które produkuje create_dataframe - wiersze już w tym kształcie
+# można eksportować bez rundy przez pandas
+_EXPORT_FIELDS = ('Date', 'Description', 'Amount', 'Type', 'Balance', 'Branch')
+
+def _csv_fast_path(expenses):
+    """CSV prosto z listy słowników, gdy wiersze mają już kolumny eksportu.
+
+    Zwraca None, gdy dane wymagają pełnej walidacji przez DataFrame.
+    """
+    first = expenses[0]
+    if not isinstance(first, dict) or not first or not set(first).issubset(_EXPORT_FIELDS):
+        return None
+    fieldnames = [f for f in _EXPORT_FIELDS if f in first]
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(expenses)
+    return buf.getvalue()
+
+# Cache DataFrame'ów eksportu: typowy front woła export-csv, a chwilę
+# później export-excel z identycznym payloadem - ramkę budujemy raz.
+DF_CACHE_SIZE = int(os.getenv('DF_CACHE_SIZE', 32))
+DF_CACHE_TTL = int(os.getenv('DF_CACHE_TTL', 300))
+_DF_CACHE = OrderedDict()  # digest -> (monotonic_ts, df)
+_DF_CACHE_LOCK = threading.Lock()
+
+def _df_for(rows):
+    """Zweryfikowany DataFrame dla payloadu eksportu, z krótkim cache'em.
+
+    Klucz to hash płaskiej serializacji JSON - ten sam payload w dwóch
+    kolejnych eksportach nie płaci drugi raz za inference typów.
+    """
+    key = hashlib.sha256(
+        json.dumps(rows, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    with _DF_CACHE_LOCK:
+        item = _DF_CACHE.get(key)
+        if item is not None:
+            ts, df = item
+            if time.monotonic() - ts <= DF_CACHE_TTL:
+                _DF_CACHE.move_to_end(key)
+                return df
+            del _DF_CACHE[key]
+
+    df = parser.create_dataframe(rows)
+    if not df.empty:
+        df = parser.validate_and_fix_columns(df)
+        with _DF_CACHE_LOCK:
+            _DF_CACHE[key] = (time.monotonic(), df)
+            _DF_CACHE.move_to_end(key)
+            while len(_DF_CACHE) > DF_CACHE_SIZE:
+                _DF_CACHE.popitem(last=False)
+    return df
+
+# Metryki arkusza Summary - stałe modułu zamiast krotek i sprawdzeń
+# `in df.columns` odtwarzanych przy każdym eksporcie
+_SUMMARY_LIST_METRICS = (
+    ('amounts', 'Lines with Amounts'),
+    ('dates', 'Lines with Dates'),
+    ('emails', 'Lines with Emails'),
+    ('phones', 'Lines with Phones'),
+)
+_SUMMARY_SUM_METRICS = (
+    ('has_numbers', 'Lines with Numbers'),
+    ('has_currency', 'Lines with Currency'),
+    ('word_count', 'Total Word Count'),
+)
+
+def _build_summary(df):
+    """Arkusze Summary i Data Types dla eksportów Excel.
+
+    Zliczenia idą jednym wektorowym przejściem po kolumnach - wspólny
+    helper dla obu endpointów zamiast dwóch kopii tego samego bloku.
+    """
+    cols = frozenset(df.columns)
+    summary_data = [['Total Rows', len(df)]]
+    for col, label in _SUMMARY_LIST_METRICS:
+        summary_data.append(
+            [label, int(df[col].str.len().gt(0).sum()) if col in cols else 0])
+    for col, label in _SUMMARY_SUM_METRICS:
+        summary_data.append([label, df[col].sum() if col in cols else 0])
+    summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
+
+    non_empty = df.astype(str).apply(lambda s: s.str.strip().ne('')).sum()
+    types_df = pd.DataFrame(
+        [[col, int(non_empty[col]), len(df) - int(non_empty[col])] for col in df.columns],
+        columns=['Column', 'Non-Empty', 'Empty'],
+    )
+    return summary_df, types_df
+
+def _df_to_csv_bytes(df):
+    """CSV jako bajty UTF-8 z BOM - jedno kodowanie, bez rundy przez str."""
+    bio = io.BytesIO()
+    tio = io.TextIOWrapper(bio, encoding='utf-8-sig', newline='', write_through=True)
+    df.to_csv(tio, index=False, lineterminator='\n')
+    tio.flush()
+    return bio.getvalue()
+
+# Ile wierszy DataFrame trafia do jednego fragmentu strumienia CSV
+CSV_STREAM_CHUNK = int(os.getenv('CSV_STREAM_CHUNK', 10000))
+
+def _iter_csv_bytes(df, chunk=None):
+    """Generator CSV po fragmentach - w pamięci żyje tylko bieżący kawałek.
+
+    Szczyt RSS nie rośnie z liczbą wierszy, a klient dostaje pierwsze
+    bajty zanim powstanie reszta pliku.
+    """
+    chunk = chunk or CSV_STREAM_CHUNK
+    yield b'\xef\xbb\xbf'  # BOM, jak w _df_to_csv_bytes
+    for start in range(0, len(df), chunk):
+        part = df.iloc[start:start + chunk]
+        yield part.to_csv(index=False, header=(start == 0),
+                          lineterminator='\n').encode('utf-8')
+
+# Cache wyników parsowania po SHA-256 zawartości pliku. Fronty potrafią
+# wysłać ten sam PDF kilka razy (retry, dwuklik, druga karta) - trafienie
+# w cache odpowiada w milisekundy zamiast parsować od nowa.
+PARSE_CACHE_SIZE = int(os.getenv('PARSE_CACHE_SIZE', 256))
+PARSE_CACHE_TTL = int(os.getenv('PARSE_CACHE_TTL', 3600))
+_PARSE_CACHE = OrderedDict()  # digest -> (monotonic_ts, result)
+_PARSE_CACHE_LOCK = threading.Lock()
+
+def _parse_cache_get(digest):
+    with _PARSE_CACHE_LOCK:
+        item = _PARSE_CACHE.get(digest)
+        if item is None:
+            return None
+        ts, result = item
+        if time.monotonic() - ts > PARSE_CACHE_TTL:
+            del _PARSE_CACHE[digest]
+            return None
+        _PARSE_CACHE.move_to_end(digest)
+        return result
+
+def _parse_cache_put(digest, result):
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[digest] = (time.monotonic(), result)
+        _PARSE_CACHE.move_to_end(digest)
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+
+def _parse_one(pdf_bytes, filename):
+    """Parsowanie jednego PDF-a z bajtów (wywoływane w puli wątków)."""
+    result = parser.parse_pdf_stream(pdf_bytes)
+    result['filename'] = filename
+    return result
+
+# --- Zadania w tle: POST zwraca job_id, wynik płynie przez SSE ---
+JOB_REGISTRY = {}
+JOB_REGISTRY_LOCK = threading.Lock()
+
 # --- Supabase (opcjonalnie) ---
 SUPABASE_ENABLED = False
 supabase_manager = None
@@ -36,22 +277,58 @@ try:
     from supabase_client import SupabaseExpenseManager
     supabase_manager = SupabaseExpenseManager()
     SUPABASE_ENABLED = True
-    print("✓ Supabase connection initialized")
+    log.info("Supabase connection initialized")
 except Exception as e:
-    print(f"⚠ Supabase not configured: {e}")
+    log.warning("Supabase not configured: %s", e)
+
+def _static_json(payload):
+    """Serializacja stałej odpowiedzi raz, przy imporcie modułu."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+# Odpowiedzi, które nie zmieniają się między żądaniami (SUPABASE_ENABLED
+# jest ustalane raz przy starcie) - zero serializacji per request
+_HEALTH_BODY = _static_json({
+    'status': 'OK',
+    'message': 'Enhanced PDF Parser API działa poprawnie',
+    'supabase_enabled': SUPABASE_ENABLED,
+})
+_API_HEALTH_BODY = _static_json({
+    'status': 'OK',
+    'message': 'Enhanced PDF Parser API działa poprawnie',
+    'supabase_enabled': SUPABASE_ENABLED,
+    'endpoints': {
+        'parse_pdf': '/api/parse-pdf',
+        'parse_multiple': '/api/parse-multiple-pdfs',
+        'export_csv': '/api/export-csv',
+        'export_excel': '/api/export-excel',
+        'export_pdf_data_csv': '/api/export-pdf-data-csv',
+        'export_pdf_data_excel': '/api/export-pdf-data-excel',
+        'analyze': '/api/analyze'
+    }
+})
+_PARSE_PDF_INFO_BODY = _static_json({
+    'message': 'PDF Parser Endpoint',
+    'method': 'POST',
+    'description': 'Send PDF file via POST request with form-data field "pdf"',
+    'example': 'Use POST method with multipart/form-data containing PDF file'
+})
+_PARSE_MULTI_INFO_BODY = _static_json({
+    'message': 'Multiple PDF Parser Endpoint',
+    'method': 'POST',
+    'description': 'Send multiple PDF files via POST request with form-data field "pdfs"',
+    'example': 'Use POST method with multipart/form-data containing multiple PDF files',
+    'note': 'This endpoint processes multiple PDFs and returns combined results'
+})
 
 @app.route('/api/parse-pdf', methods=['POST', 'GET'])
-def parse_pdf_endpoint():
+async def parse_pdf_endpoint():
     """Parsowanie pojedynczego PDF (multipart/form-data, pole 'pdf')"""
-    
+
     if request.method == 'GET':
-        return jsonify({
-            'message': 'PDF Parser Endpoint',
-            'method': 'POST',
-            'description': 'Send PDF file via POST request with form-data field "pdf"',
-            'example': 'Use POST method with multipart/form-data containing PDF file'
-        })
-    
+        return Response(_PARSE_PDF_INFO_BODY, mimetype='application/json')
+
     # POST method - actual PDF parsing
     try:
         if 'pdf' not in request.files:
@@ -60,99 +337,193 @@ def parse_pdf_endpoint():
         if not file.filename:
             return jsonify({'error': 'Nie wybrano pliku'}), 400
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            file.save(tmp_file.name)
-            result = parser.parse_pdf_to_structured_data(tmp_file.name)
-            os.unlink(tmp_file.name)
+        # Parsowanie prosto z pamięci - bez pliku tymczasowego w /tmp
+        buf = file.stream.read()
+
+        # Ten sam plik wysłany ponownie? Wynik mamy już w cache'u.
+        digest = hashlib.sha256(buf).hexdigest()
+        cached = None if request.args.get('nocache') else _parse_cache_get(digest)
+        if cached is not None:
+            log.debug("parse-pdf: cache hit for %s", digest[:12])
+            # Płytka kopia - handler dokleja pola do wyniku per żądanie
+            return jsonify(dict(cached))
+
+        # Parsowanie w wątku roboczym, żeby nie blokować pętli zdarzeń
+        result = await asyncio.to_thread(parser.parse_pdf_stream, buf)
 
         if SUPABASE_ENABLED and result.get('success'):
-            try:
-                supabase_result = supabase_manager.save_expense(result)
-                result['supabase_saved'] = supabase_result.get('success', False)
-            except Exception as e:
-                result['supabase_saved'] = False
-                result['supabase_error'] = str(e)
+            if request.args.get('await_save'):
+                # Klient chce potwierdzenia zapisu - stara, synchroniczna ścieżka
+                try:
+                    supabase_result = await asyncio.to_thread(supabase_manager.save_expense, result)
+                    result['supabase_saved'] = supabase_result.get('success', False)
+                except Exception as e:
+                    result['supabase_saved'] = False
+                    result['supabase_error'] = str(e)
+            else:
+                # Zapis w tle - odpowiedź nie czeka na rundę sieciową
+                _BG.submit(_safe_save, supabase_manager.save_expense, result)
+                result['supabase_saved'] = 'queued'
 
         # Return data in format that frontend can export
         if result.get('success') and result.get('structured_data'):
-            # Add the structured data for export
-            result['export_data'] = result['structured_data']
             result['total_rows'] = len(result['structured_data'])
-            # Add transactions field for frontend compatibility
+            # 'transactions' to alias structured_data dla frontu; JSON i tak
+            # wypisze listę dwa razy, więc nie dokładamy trzeciej kopii
             result['transactions'] = result['structured_data']
-        
+
+        if result.get('success'):
+            _parse_cache_put(digest, result)
+
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/parse-pdf-async', methods=['POST'])
+def parse_pdf_async_endpoint():
+    """Parsowanie w tle: od razu zwraca job_id, postęp i wynik przez /api/jobs/<id>.
+
+    Duży PDF nie blokuje workera na czas całego parsowania - klient
+    POST-uje plik, dostaje 202 z identyfikatorem i subskrybuje SSE.
+    """
+    try:
+        if 'pdf' not in request.files:
+            return jsonify({'error': 'Brak pliku PDF'}), 400
+        file = request.files['pdf']
+        if not file.filename:
+            return jsonify({'error': 'Nie wybrano pliku'}), 400
+
+        job_id = uuid.uuid4().hex
+        events = queue.Queue()
+        with JOB_REGISTRY_LOCK:
+            JOB_REGISTRY[job_id] = events
+
+        pdf_bytes = file.stream.read()
+        filename = file.filename
+
+        def _job():
+            events.put({'event': 'status', 'data': {'state': 'parsing', 'filename': filename}})
+            try:
+                result = _parse_one(pdf_bytes, filename)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            events.put({'event': 'done', 'data': result})
+
+        EXECUTOR.submit(_job)
+        return jsonify({'job_id': job_id}), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_events_endpoint(job_id):
+    """SSE ze statusem zadania parsowania; kończy się zdarzeniem 'done'."""
+    with JOB_REGISTRY_LOCK:
+        events = JOB_REGISTRY.get(job_id)
+    if events is None:
+        return jsonify({'error': 'Nieznane zadanie'}), 404
+
+    def gen():
+        while True:
+            item = events.get()
+            payload = app.json.dumps(item['data'])
+            yield f"event: {item['event']}\ndata: {payload}\n\n"
+            if item['event'] == 'done':
+                break
+        with JOB_REGISTRY_LOCK:
+            JOB_REGISTRY.pop(job_id, None)
+
+    return Response(stream_with_context(gen()), mimetype='text/event-stream')
+
 @app.route('/api/parse-multiple-pdfs', methods=['POST', 'GET'])
-def parse_multiple_pdfs_endpoint():
+async def parse_multiple_pdfs_endpoint():
     """Parsowanie wielu PDF (multipart/form-data, pola 'pdfs')"""
     
     if request.method == 'GET':
-        return jsonify({
-            'message': 'Multiple PDF Parser Endpoint',
-            'method': 'POST',
-            'description': 'Send multiple PDF files via POST request with form-data field "pdfs"',
-            'example': 'Use POST method with multipart/form-data containing multiple PDF files',
-            'note': 'This endpoint processes multiple PDFs and returns combined results'
-        })
-    
+        return Response(_PARSE_MULTI_INFO_BODY, mimetype='application/json')
+
     # POST method - actual PDF parsing
     try:
-        print("=== MULTIPLE PDFS ENDPOINT STARTED ===")
         files = request.files.getlist('pdfs')
-        print(f"=== RECEIVED {len(files)} FILES ===")
+        log.debug("parse-multiple-pdfs: received %d files", len(files))
         
         if not files:
             return jsonify({'error': 'Brak plików PDF'}), 400
 
-        results = []
-        for i, f in enumerate(files):
-            if f and f.filename.endswith('.pdf'):
-                print(f"=== PROCESSING FILE {i+1}/{len(files)}: {f.filename} ===")
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                    f.save(tmp_file.name)
-                    print(f"=== FILE SAVED TO TEMP: {tmp_file.name} ===")
-                    try:
-                        print(f"=== STARTING PARSING: {f.filename} ===")
-                        result = parser.parse_pdf_to_structured_data(tmp_file.name)
-                        print(f"=== PARSING COMPLETED: {f.filename}, Success: {result.get('success')} ===")
-                        results.append(result)
-                    finally:
-                        os.unlink(tmp_file.name)
-                        print(f"=== TEMP FILE DELETED: {tmp_file.name} ===")
-
-        print(f"=== PROCESSING {len(results)} RESULTS ===")
-        
-        df = parser.create_dataframe(results[0]['structured_data'] if results else [])
-        print(f"=== DATAFRAME CREATED, SHAPE: {df.shape if hasattr(df, 'shape') else 'N/A'} ===")
-        
+        # Każdy plik trafia do puli wątków - parsowanie biegnie równolegle
+        futures = [
+            EXECUTOR.submit(_parse_one, f.stream.read(), f.filename)
+            for f in files
+            if f and f.filename.endswith('.pdf')
+        ]
+        if 'application/x-ndjson' in request.headers.get('Accept', ''):
+            # Strumień NDJSON: wynik każdego pliku wychodzi od razu po
+            # sparsowaniu (w kolejności ukończenia), na końcu linia
+            # z podsumowaniem - klient nie czeka na najwolniejszy PDF,
+            # a serwer nie trzyma wszystkich wyników naraz w pamięci
+            total_files = len(files)
+
+            def ndjson_stream():
+                done = []
+                for fu in as_completed(futures):
+                    result = fu.result()
+                    done.append(result)
+                    yield app.json.dumps(result).encode('utf-8') + b'\n'
+                if SUPABASE_ENABLED:
+                    _BG.submit(_safe_save, supabase_manager.save_multiple_expenses, done)
+                yield app.json.dumps({
+                    'summary': True,
+                    'total_files': total_files,
+                    'successful_files': len([r for r in done if r.get('success')]),
+                }).encode('utf-8') + b'\n'
+
+            return Response(stream_with_context(ndjson_stream()),
+                            mimetype='application/x-ndjson')
+
+        results = [await asyncio.wrap_future(fu) for fu in futures]
+        log.debug("parse-multiple-pdfs: parsed %d files concurrently", len(results))
+
+        # Podsumowanie liczone ze WSZYSTKICH plików - pojedynczy concat zamiast
+        # budowania DataFrame per plik
+        frames = [
+            pd.DataFrame(r['structured_data'])
+            for r in results
+            if r.get('success') and r.get('structured_data')
+        ]
+        df = pd.concat(frames, ignore_index=True, copy=False) if frames else pd.DataFrame()
+
         # Generate basic summary since generate_summary_report method doesn't exist
         summary = {
             'total_rows': len(df) if hasattr(df, "empty") and not df.empty else 0,
-            'columns': list(df.columns) if hasattr(df, "empty") and not df.empty else [],
-            'data_types': {col: str(dtype) for col, dtype in df.dtypes.items()} if hasattr(df, "empty") and not df.empty else {}
+            'columns': df.columns.tolist() if hasattr(df, "empty") and not df.empty else [],
+            'data_types': df.dtypes.astype(str).to_dict() if hasattr(df, "empty") and not df.empty else {}
         }
-        print(f"=== SUMMARY CREATED: {summary} ===")
 
-        # Add export_data for consistency with single PDF endpoint
-        export_data = results[0]['structured_data'] if results and results[0].get('success') else []
-        total_rows = len(export_data)
-        # Add transactions field for frontend compatibility
-        transactions = export_data
-        print(f"=== EXPORT DATA PREPARED: {len(export_data)} items ===")
+        # Spłaszczone wiersze ze wszystkich plików - front czyta 'transactions'
+        # ('export_data' usunięte: JSON wypisywał te same wiersze drugi raz,
+        # podwajając rozmiar odpowiedzi i czas serializacji)
+        transactions = [
+            row
+            for r in results
+            if r.get('success')
+            for row in (r.get('structured_data') or [])
+        ]
+        total_rows = len(transactions)
+        log.debug("parse-multiple-pdfs: prepared %d export rows", total_rows)
 
         supabase_saved = False
         if SUPABASE_ENABLED:
-            try:
-                print("=== SAVING TO SUPABASE ===")
-                supabase_result = supabase_manager.save_multiple_expenses(results)
-                supabase_saved = supabase_result.get('success', False)
-                print(f"=== SUPABASE SAVE RESULT: {supabase_saved} ===")
-            except Exception as e:
-                print(f"=== SUPABASE SAVE ERROR: {e} ===")
-                supabase_saved = False
+            if request.args.get('await_save'):
+                # Klient chce potwierdzenia zapisu - stara, synchroniczna ścieżka
+                try:
+                    supabase_result = await asyncio.to_thread(supabase_manager.save_multiple_expenses, results)
+                    supabase_saved = supabase_result.get('success', False)
+                except Exception as e:
+                    log.warning("Supabase save failed: %s", e)
+                    supabase_saved = False
+            else:
+                # Zapis w tle - odpowiedź nie czeka na rundę sieciową
+                _BG.submit(_safe_save, supabase_manager.save_multiple_expenses, results)
+                supabase_saved = 'queued'
 
         response_data = {
             'results': results,
@@ -160,22 +531,14 @@ def parse_multiple_pdfs_endpoint():
             'total_files': len(files),
             'successful_files': len([r for r in results if r.get('success')]),
             'supabase_saved': supabase_saved,
-            'export_data': export_data,      # ✅ Added for consistency
             'total_rows': total_rows,        # ✅ Added for consistency
             'transactions': transactions,    # ✅ Added for frontend compatibility
             'success': len([r for r in results if r.get('success')]) > 0  # ✅ Added success flag
         }
         
-        print("=== PREPARING JSON RESPONSE ===")
-        print(f"=== RESPONSE DATA KEYS: {list(response_data.keys())} ===")
-        print("=== SENDING RESPONSE ===")
-        
         return jsonify(response_data)
     except Exception as e:
-        print(f"=== MULTIPLE PDFS ENDPOINT ERROR: {e} ===")
-        print(f"=== ERROR TYPE: {type(e).__name__} ===")
-        import traceback
-        print(f"=== TRACEBACK: {traceback.format_exc()} ===")
+        log.exception("parse-multiple-pdfs failed")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/export-csv', methods=['POST'])
@@ -187,26 +550,33 @@ def export_csv_endpoint():
         if not expenses:
             return jsonify({'error': 'Brak danych do eksportu'}), 400
 
-        # Convert to DataFrame first for universal parser
-        try:
-            df = parser.create_dataframe(expenses)
-            if df.empty:
-                return jsonify({'error': 'No data to export'}), 400
-            # Apply column validation and fixing
-            df = parser.validate_and_fix_columns(df)
-        except Exception as e:
-            return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
-        
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', encoding='utf-8-sig') as tmp_file:
-            df.to_csv(tmp_file.name, index=False, encoding='utf-8-sig')
-            with open(tmp_file.name, 'r', encoding='utf-8-sig') as f:
-                csv_content = f.read()
-            os.unlink(tmp_file.name)
-
-        return jsonify({
-            'csv_content': csv_content,
-            'filename': f'wydatki_{datetime.now().strftime("%Y%m%d")}.csv'
-        })
+        # Szybka ścieżka: wiersze w kształcie eksportu idą przez csv.DictWriter
+        csv_content = _csv_fast_path(expenses)
+        if csv_content is not None:
+            csv_bytes = csv_content.encode('utf-8-sig')
+        else:
+            try:
+                df = _df_for(expenses)
+                if df.empty:
+                    return jsonify({'error': 'No data to export'}), 400
+            except Exception as e:
+                return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
+
+            csv_bytes = _df_to_csv_bytes(df)
+
+        filename = f'wydatki_{datetime.now().strftime("%Y%m%d")}.csv'
+        if request.args.get('inline_json'):
+            # Tryb zgodności: stary format JSON z treścią CSV
+            return jsonify({
+                'csv_content': csv_bytes.decode('utf-8-sig'),
+                'filename': filename
+            })
+        return send_file(
+            io.BytesIO(csv_bytes),
+            mimetype='text/csv',
+            as_attachment=True,
+            download_name=filename,
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -221,26 +591,26 @@ def export_pdf_data_csv_endpoint():
         
 
 
-        # Convert to DataFrame
         try:
-            df = parser.create_dataframe(pdf_data)
+            df = _df_for(pdf_data)
             if df.empty:
                 return jsonify({'error': 'No data to export'}), 400
-            # Apply column validation and fixing
-            df = parser.validate_and_fix_columns(df)
         except Exception as e:
             return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
         
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', encoding='utf-8-sig') as tmp_file:
-            df.to_csv(tmp_file.name, index=False, encoding='utf-8-sig')
-            with open(tmp_file.name, 'r', encoding='utf-8-sig') as f:
-                csv_content = f.read()
-            os.unlink(tmp_file.name)
-
-        return jsonify({
-            'csv_content': csv_content,
-            'filename': f'pdf_data_{datetime.now().strftime("%Y%m%d")}.csv'
-        })
+        filename = f'pdf_data_{datetime.now().strftime("%Y%m%d")}.csv'
+        if request.args.get('inline_json'):
+            # Tryb zgodności: stary format JSON z treścią CSV
+            return jsonify({
+                'csv_content': _df_to_csv_bytes(df).decode('utf-8-sig'),
+                'filename': filename
+            })
+        # Eksporty z wielu PDF-ów bywają duże - strumieniujemy po fragmentach
+        return Response(
+            stream_with_context(_iter_csv_bytes(df)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -248,7 +618,6 @@ def export_pdf_data_csv_endpoint():
 def export_excel_endpoint():
     """Eksport Excel (base64) z danych z frontu: JSON { "expenses": [...] }"""
     try:
-        import base64
         data = request.json or {}
         expenses = data.get('expenses', [])
         if not expenses:
@@ -256,54 +625,39 @@ def export_excel_endpoint():
         
 
 
-        # Convert to DataFrame first for universal parser
         try:
-            df = parser.create_dataframe(expenses)
+            df = _df_for(expenses)
             if df.empty:
                 return jsonify({'error': 'No data to export'}), 400
-            # Apply column validation and fixing
-            df = parser.validate_and_fix_columns(df)
         except Exception as e:
             return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            with pd.ExcelWriter(tmp_file.name, engine='openpyxl') as writer:
-                # Main data sheet
-                df.to_excel(writer, sheet_name='Extracted Data', index=False)
-                
-                # Summary sheet
-                summary_data = [
-                    ['Total Rows', len(df)],
-                    ['Lines with Amounts', len(df[df['amounts'].str.len() > 0]) if 'amounts' in df.columns else 0],
-                    ['Lines with Dates', len(df[df['dates'].str.len() > 0]) if 'dates' in df.columns else 0],
-                    ['Lines with Emails', len(df[df['emails'].str.len() > 0]) if 'emails' in df.columns else 0],
-                    ['Lines with Phones', len(df[df['phones'].str.len() > 0]) if 'phones' in df.columns else 0],
-                    ['Lines with Numbers', df['has_numbers'].sum() if 'has_numbers' in df.columns else 0],
-                    ['Lines with Currency', df['has_currency'].sum() if 'has_currency' in df.columns else 0],
-                    ['Total Word Count', df['word_count'].sum() if 'word_count' in df.columns else 0]
-                ]
-                
-                summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Data types sheet
-                data_types = []
-                for col in df.columns:
-                    non_empty = df[col].astype(str).str.strip().ne('').sum()
-                    data_types.append([col, non_empty, len(df) - non_empty])
-                
-                types_df = pd.DataFrame(data_types, columns=['Column', 'Non-Empty', 'Empty'])
-                types_df.to_excel(writer, sheet_name='Data Types', index=False)
+        # XLSX budowany w pamięci - bez pliku tymczasowego
+        buf = io.BytesIO()
+        # xlsxwriter w trybie constant_memory streamuje wiersze zamiast
+        # trzymać cały skoroszyt w RAM (openpyxl buduje obiekt na komórkę)
+        with pd.ExcelWriter(buf, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True, 'in_memory': True}}) as writer:
+            # Main data sheet
+            df.to_excel(writer, sheet_name='Extracted Data', index=False)
+
+            # Summary i Data Types liczone raz, wspólnym helperem
+            summary_df, types_df = _build_summary(df)
+            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+            types_df.to_excel(writer, sheet_name='Data Types', index=False)
             
-            with open(tmp_file.name, 'rb') as f:
-                excel_content = f.read()
-            os.unlink(tmp_file.name)
-
-        excel_b64 = base64.b64encode(excel_content).decode('utf-8')
-        return jsonify({
-            'excel_content': excel_b64,
-            'filename': f'wydatki_{datetime.now().strftime("%Y%m%d")}.xlsx'
-        })
+        filename = f'wydatki_{datetime.now().strftime("%Y%m%d")}.xlsx'
+        if request.args.get('inline_base64'):
+            # Tryb zgodności: stary format JSON + base64 (33% większy payload)
+            excel_b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+            return jsonify({'excel_content': excel_b64, 'filename': filename})
+        buf.seek(0)
+        return send_file(
+            buf,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=filename,
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -311,7 +665,6 @@ def export_excel_endpoint():
 def export_pdf_data_excel_endpoint():
     """Eksport Excel z danych PDF (nowy endpoint dla universal parser)"""
     try:
-        import base64
         data = request.json or {}
         pdf_data = data.get('pdf_data', [])
         if not pdf_data:
@@ -319,57 +672,89 @@ def export_pdf_data_excel_endpoint():
         
 
 
-        # Convert to DataFrame
         try:
-            df = parser.create_dataframe(pdf_data)
+            df = _df_for(pdf_data)
             if df.empty:
                 return jsonify({'error': 'No data to export'}), 400
-            # Apply column validation and fixing
-            df = parser.validate_and_fix_columns(df)
         except Exception as e:
             return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            with pd.ExcelWriter(tmp_file.name, engine='openpyxl') as writer:
-                # Main data sheet
-                df.to_excel(writer, sheet_name='Extracted Data', index=False)
-                
-                # Summary sheet
-                summary_data = [
-                    ['Total Rows', len(df)],
-                    ['Lines with Amounts', len(df[df['amounts'].str.len() > 0]) if 'amounts' in df.columns else 0],
-                    ['Lines with Dates', len(df[df['dates'].str.len() > 0]) if 'dates' in df.columns else 0],
-                    ['Lines with Emails', len(df[df['emails'].str.len() > 0]) if 'emails' in df.columns else 0],
-                    ['Lines with Phones', len(df[df['phones'].str.len() > 0]) if 'phones' in df.columns else 0],
-                    ['Lines with Numbers', df['has_numbers'].sum() if 'has_numbers' in df.columns else 0],
-                    ['Lines with Currency', df['has_currency'].sum() if 'has_currency' in df.columns else 0],
-                    ['Total Word Count', df['word_count'].sum() if 'word_count' in df.columns else 0]
-                ]
-                
-                summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                
-                # Data types sheet
-                data_types = []
-                for col in df.columns:
-                    non_empty = df[col].astype(str).str.strip().ne('').sum()
-                    data_types.append([col, non_empty, len(df) - non_empty])
-                
-                types_df = pd.DataFrame(data_types, columns=['Column', 'Non-Empty', 'Empty'])
-                types_df.to_excel(writer, sheet_name='Data Types', index=False)
+        # XLSX budowany w pamięci - bez pliku tymczasowego
+        buf = io.BytesIO()
+        # xlsxwriter w trybie constant_memory streamuje wiersze zamiast
+        # trzymać cały skoroszyt w RAM (openpyxl buduje obiekt na komórkę)
+        with pd.ExcelWriter(buf, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True, 'in_memory': True}}) as writer:
+            # Main data sheet
+            df.to_excel(writer, sheet_name='Extracted Data', index=False)
+
+            # Summary i Data Types liczone raz, wspólnym helperem
+            summary_df, types_df = _build_summary(df)
+            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+            types_df.to_excel(writer, sheet_name='Data Types', index=False)
             
-            with open(tmp_file.name, 'rb') as f:
-                excel_content = f.read()
-            os.unlink(tmp_file.name)
-
-        excel_b64 = base64.b64encode(excel_content).decode('utf-8')
-        return jsonify({
-            'excel_content': excel_b64,
-            'filename': f'pdf_data_{datetime.now().strftime("%Y%m%d")}.xlsx'
-        })
+        filename = f'pdf_data_{datetime.now().strftime("%Y%m%d")}.xlsx'
+        if request.args.get('inline_base64'):
+            # Tryb zgodności: stary format JSON + base64 (33% większy payload)
+            excel_b64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+            return jsonify({'excel_content': excel_b64, 'filename': filename})
+        buf.seek(0)
+        return send_file(
+            buf,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=filename,
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _arrow_export(fmt):
+    """Wspólny handler eksportu Parquet/Feather: JSON { "expenses": [...] }.
+
+    Formaty kolumnowe serializują się kilkukrotnie szybciej niż CSV
+    i dają 2-3x mniejsze pliki - dla dużych wyciągów to tańsza droga.
+    """
+    if pyarrow is None:
+        return jsonify({'error': 'pyarrow not installed'}), 501
+    try:
+        data = request.json or {}
+        expenses = data.get('expenses', [])
+        if not expenses:
+            return jsonify({'error': 'Brak danych do eksportu'}), 400
+
+        try:
+            df = _df_for(expenses)
+            if df.empty:
+                return jsonify({'error': 'No data to export'}), 400
+        except Exception as e:
+            return jsonify({'error': f'Error creating DataFrame: {str(e)}'}), 500
+
+        buf = io.BytesIO()
+        stamp = datetime.now().strftime("%Y%m%d")
+        if fmt == 'parquet':
+            df.to_parquet(buf, engine='pyarrow', compression='zstd', index=False)
+            filename = f'wydatki_{stamp}.parquet'
+            mimetype = 'application/vnd.apache.parquet'
+        else:
+            df.to_feather(buf, compression='lz4')
+            filename = f'wydatki_{stamp}.feather'
+            mimetype = 'application/vnd.apache.arrow.file'
+        buf.seek(0)
+        return send_file(buf, mimetype=mimetype, as_attachment=True,
+                         download_name=filename)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/export-parquet', methods=['POST'])
+def export_parquet_endpoint():
+    """Eksport Parquet z danych z frontu: JSON { "expenses": [...] }"""
+    return _arrow_export('parquet')
+
+@app.route('/api/export-feather', methods=['POST'])
+def export_feather_endpoint():
+    """Eksport Feather (Arrow IPC) z danych z frontu: JSON { "expenses": [...] }"""
+    return _arrow_export('feather')
+
 @app.route('/api/expenses', methods=['GET'])
 def get_expenses_endpoint():
     """Odczyt z Supabase (opcjonalne)"""
@@ -420,29 +805,12 @@ def delete_expense_endpoint(expense_id):
 @app.route('/health', methods=['GET'])
 def health_check():
     """Healthcheck dla ALB/EB"""
-    return jsonify({
-        'status': 'OK',
-        'message': 'Enhanced PDF Parser API działa poprawnie',
-        'supabase_enabled': SUPABASE_ENABLED,
-    })
+    return Response(_HEALTH_BODY, mimetype='application/json')
 
 @app.route('/api/health', methods=['GET'])
 def api_health_check():
     """API Healthcheck endpoint"""
-    return jsonify({
-        'status': 'OK',
-        'message': 'Enhanced PDF Parser API działa poprawnie',
-        'supabase_enabled': SUPABASE_ENABLED,
-        'endpoints': {
-            'parse_pdf': '/api/parse-pdf',
-            'parse_multiple': '/api/parse-multiple-pdfs',
-            'export_csv': '/api/export-csv',
-            'export_excel': '/api/export-excel',
-            'export_pdf_data_csv': '/api/export-pdf-data-csv',
-            'export_pdf_data_excel': '/api/export-pdf-data-excel',
-            'analyze': '/api/analyze'
-        }
-    })
+    return Response(_API_HEALTH_BODY, mimetype='application/json')
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_endpoint():
@@ -453,17 +821,61 @@ def analyze_endpoint():
         if not expenses:
             return jsonify({'error': 'Brak danych do analizy'}), 400
 
-        df = parser.create_dataframe(expenses)
+        # Agregacja wprost po liście słowników - bez budowania DataFrame
+        # (inference typów i BlockManager kosztują więcej niż samo zliczanie)
+        counts = Counter()
+        columns = {}  # dict zamiast set - zachowuje kolejność pierwszego wystąpienia
+        types = {}
+        for row in expenses:
+            if not isinstance(row, dict):
+                continue
+            for key, value in row.items():
+                columns[key] = None
+                if key not in types and value is not None:
+                    types[key] = type(value).__name__
+                if str(value).strip():
+                    counts[key] += 1
+
         summary = {
-            'total_rows': len(df),
-            'columns': list(df.columns),
-            'data_types': {col: str(dtype) for col, dtype in df.dtypes.items()},
-            'non_empty_counts': {col: df[col].astype(str).str.strip().ne('').sum() for col in df.columns}
+            'total_rows': len(expenses),
+            'columns': list(columns),
+            'data_types': {col: types.get(col, 'NoneType') for col in columns},
+            'non_empty_counts': {col: counts.get(col, 0) for col in columns}
         }
         return jsonify({'summary': summary, 'success': True})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Minimalny pusty PDF (1 strona) do rozgrzewki parsera przy starcie
+_EMPTY_PDF_BYTES = (
+    b'%PDF-1.4\n'
+    b'1 0 obj\n<</Type/Catalog/Pages 2 0 R>>\nendobj\n'
+    b'2 0 obj\n<</Type/Pages/Kids[3 0 R]/Count 1>>\nendobj\n'
+    b'3 0 obj\n<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Resources<<>>>>\nendobj\n'
+    b'xref\n0 4\n'
+    b'0000000000 65535 f \n'
+    b'0000000009 00000 n \n'
+    b'0000000054 00000 n \n'
+    b'0000000105 00000 n \n'
+    b'trailer\n<</Size 4/Root 1 0 R>>\nstartxref\n184\n%%EOF\n'
+)
+
+def warmup():
+    """Rozgrzewka parsera przy imporcie workera.
+
+    Jeden przebieg po pustym PDF-ie ładuje pdfplumber/PyPDF2 i wygrzewa
+    skompilowane wzorce, zanim pierwszy prawdziwy request zapłaci za
+    zimny start. Błąd rozgrzewki nie może zablokować startu serwera.
+    """
+    try:
+        parser.parse_pdf_stream(_EMPTY_PDF_BYTES)
+        log.debug("parser warmup complete")
+    except Exception as e:
+        log.debug("parser warmup skipped: %s", e)
+
+if not os.getenv('SKIP_WARMUP'):
+    warmup()
+
 if __name__ == '__main__':
     # Lokalne uruchomienie (na EB i tak odpali Gunicorn przez wsgi.py)
     app.run(debug=False, host='0.0.0.0', port=5000)
@@ -1,25 +1,149 @@
 # Universal PDF Parser - Converts ANY PDF to Structured Data
 # Fast conversion to Excel/CSV format with columns and rows
 
+import io
+import logging
 import PyPDF2
 import re
 import pandas as pd
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 try:
     import pdfplumber  # Layout-aware PDF text extraction
 except Exception:
     pdfplumber = None
+try:
+    import fitz  # PyMuPDF - C-backed text extraction, much faster than PyPDF2
+except Exception:
+    fitz = None
+
+# Library code logs instead of printing; stdout writes in the hot loop are
+# surprisingly expensive under gunicorn and cannot be filtered by level
+log = logging.getLogger(__name__)
+
+_AMOUNT_JUNK_RE = re.compile(r'[^\d.,-]')
+# Date-shape patterns for _format_date_cached, compiled at import
+_DMY_FULL_RE = re.compile(r'^\d{1,2}-\d{1,2}-\d{4}$')
+_SLASH_DATE_RE = re.compile(r'\d{1,2}/\d{1,2}/\d{4}')
+_SLASH_FULL_RE = re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$')
+_SLASH_NOYEAR_RE = re.compile(r'^\d{1,2}/\d{1,2}$')
+_DASH_NOYEAR_RE = re.compile(r'^\d{1,2}-\d{1,2}$')
+_ISO_DATE_RE = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
+# Fast path: drop the junk that actually shows up around amounts (currency
+# symbols, signs, whitespace, parentheses) with one C-level translate
+_AMOUNT_STRIP_TABLE = str.maketrans('', '', '$€£¥₽₹₩₪₦₨₴₸₺₼₾₿+() \t')
+_AMOUNT_ALLOWED = frozenset('0123456789.,-')
+
+
+@lru_cache(maxsize=4096)
+def _parse_amount_cached(amount_str: str) -> float:
+    """Parse an amount string to float.
+
+    Module-level and memoized: statements repeat the same amount strings
+    (balances, fees, round figures), so repeats are a dict hit instead of
+    a regex sub plus float parse.
+    """
+    try:
+        s = amount_str.strip()
+        # Parentheses mean negative
+        is_negative = s.startswith('(') and s.endswith(')')
+        # Remove everything except digits, comma, dot, minus
+        cleaned = s.translate(_AMOUNT_STRIP_TABLE)
+        if not _AMOUNT_ALLOWED.issuperset(cleaned):
+            # Unusual junk the table does not cover - fall back to the regex
+            cleaned = _AMOUNT_JUNK_RE.sub('', cleaned)
+        # Remove thousands separators
+        cleaned = cleaned.replace(',', '')
+        if cleaned.count('-') > 1:
+            cleaned = cleaned.replace('-', '', cleaned.count('-') - 1)
+        value = float(cleaned) if cleaned else 0.0
+        if is_negative and value > 0:
+            value = -value
+        return value
+    except:
+        return 0.0
+
+
+@lru_cache(maxsize=4096)
+def _format_date_cached(date_str: str) -> str:
+    """Format a date string to YYYY-MM-DD with improved DD-MM-YYYY support.
+
+    Module-level and memoized: the same handful of dates appear over and
+    over within a statement, so repeats skip the regex cascade entirely.
+    No-year dates assume the year at first-call time, same as before for
+    any single parse run.
+    """
+    try:
+        # Handle DD-MM-YYYY format (Indian bank statements)
+        if _DMY_FULL_RE.match(date_str):
+            day, month, year = date_str.split('-')
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle DD/MM/YYYY format
+        if _SLASH_DATE_RE.match(date_str):
+            parts = date_str.split('/')
+            # Check if it's likely DD/MM/YYYY (day > 12) or MM/DD/YYYY (month > 12)
+            if len(parts) == 3:
+                first, second, year = parts
+                if int(first) > 12:  # First part is day (DD/MM/YYYY)
+                    day, month = first, second
+                else:  # First part is month (MM/DD/YYYY)
+                    month, day = first, second
+                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle MM/DD/YYYY format (US format)
+        if _SLASH_FULL_RE.match(date_str):
+            month, day, year = date_str.split('/')
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle MM/DD without year -> assume current year
+        if _SLASH_NOYEAR_RE.match(date_str):
+            month, day = date_str.split('/')
+            year = str(pd.Timestamp.now().year)
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle MM-DD-YYYY (US format)
+        if _DMY_FULL_RE.match(date_str):
+            month, day, year = date_str.split('-')
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle MM-DD without year -> assume current year
+        if _DASH_NOYEAR_RE.match(date_str):
+            month, day = date_str.split('-')
+            year = str(pd.Timestamp.now().year)
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+
+        # Handle YYYY-MM-DD format (already correct)
+        elif _ISO_DATE_RE.match(date_str):
+            return date_str
+
+        # Handle other formats - try to parse
+        else:
+            # Normalize month names (short/full) and remove commas
+            normalized = date_str.replace(',', '').strip()
+            # Try pandas to_datetime for various formats
+            parsed_date = pd.to_datetime(normalized, errors='coerce')
+            if pd.notna(parsed_date):
+                return parsed_date.strftime('%Y-%m-%d')
+
+    except Exception as e:
+        log.warning("Error formatting date %s: %s", date_str, e)
+
+    return date_str
+
 
 class UniversalPDFParser:
     def __init__(self):
-        # Enhanced patterns for banking data
-        self.amount_patterns = [
+        # Enhanced patterns for banking data - compiled once here so the
+        # per-line hot paths skip re's cache lookup on every call
+        amount_raw = (
             r'\$?[\d,]+\.?\d*',  # $1,234.56 or 1234.56
             r'[\d,]+\.?\d*',     # 1,234.56 or 1234.56
             r'[-+]?\d+\.?\d*',   # -123.45 or +123.45
-        ]
-        
-        self.date_patterns = [
+        )
+        self.amount_patterns = [re.compile(p) for p in amount_raw]
+
+        date_raw = (
             r'\d{1,2}[/-]\d{1,2}[/-]\d{4}',  # MM/DD/YYYY or MM-DD-YYYY or DD-MM-YYYY
             r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',  # YYYY/MM/DD or YYYY-MM-DD
             r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}',  # DD Mon YYYY
@@ -28,59 +152,204 @@ class UniversalPDFParser:
             r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)(?:\s*,?\s*\d{4})?',  # DD Month [YYYY]
             r'\b\d{1,2}/\d{1,2}\b',  # MM/DD without year
             r'\b\d{1,2}-\d{1,2}\b',  # MM-DD without year
-        ]
-        
-        self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        self.phone_pattern = r'[\+]?[1-9][\d]{0,15}'
-        
+        )
+        self.date_patterns = [re.compile(p) for p in date_raw]
+
+        # Combined alternations: one sweep over the line per family instead
+        # of one sweep per pattern (none of the patterns capture groups)
+        self.amount_combined = re.compile('|'.join(f'(?:{p})' for p in amount_raw))
+        self.date_combined = re.compile('|'.join(f'(?:{p})' for p in date_raw))
+
+        # Whitespace collapser shared by the description cleanup sites
+        self._ws_re = re.compile(r'\s+')
+        # Cheap digit probe - gates the amount scanners so lines without a
+        # single digit skip the heavier currency regexes entirely
+        self._digit_probe = re.compile(r'\d')
+        self._currency_num_re = re.compile(r'(\(?-?\$?[\d,]+(?:\.\d{2})?\)?)')
+        self._amount_candidate_patterns = [re.compile(p) for p in (
+            r'\(?-?\$?[\d,]+(?:\.\d{2})?\)?',  # Standard currency format
+            r'\(?-?[\d,]+(?:\.\d{2})?\)?',      # Numbers with parentheses for negatives
+            r'-?\$?[\d,]+(?:\.\d{2})?',         # Standard positive/negative amounts
+            r'[\d,]+(?:\.\d{2})?',              # Just numbers with commas and decimals
+        )]
+
+        # Remaining per-line patterns, compiled once like the rest above
+        self._amount_2dp_re = re.compile(r'([\d,]+\.?\d{2})')          # amounts with 2 decimals
+        self._num_re = re.compile(r'[\d,]+\.?\d*')                      # any number
+        self._dmy_date_re = re.compile(r'(\d{1,2}-\d{1,2}-\d{4})')      # DD-MM-YYYY
+        self._slashdash_date_re = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}')
+        self._iso_date_re = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
+        self._iso_strict_re = re.compile(r'\d{4}-\d{2}-\d{2}')
+        self._any_date_re = re.compile(
+            r'\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}-\d{1,2}-\d{4}')
+        self._mon_dd_re = re.compile(
+            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})', re.IGNORECASE)
+        self._drcr_re = re.compile(r'\b(DR|CR)\b')
+        self._type_word_re = re.compile(r'\b(DR|CR|DEBIT|CREDIT)\b', re.IGNORECASE)
+        # DD-MM-YYYY + description + amount + DR/CR + balance [+ branch]
+        self._indian_txn_re = re.compile(
+            r'(\d{1,2}-\d{1,2}-\d{4})\s+(.+?)\s+([\d,]+\.?\d{2})\s+(DR|CR)\s+([\d,]+\.?\d{2})\s+(.+)')
+        self._indian_txn_no_branch_re = re.compile(
+            r'(\d{1,2}-\d{1,2}-\d{4})\s+(.+?)\s+([\d,]+\.?\d{2})\s+(DR|CR)\s+([\d,]+\.?\d{2})')
+
+        self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+        self.phone_pattern = re.compile(r'[\+]?[1-9][\d]{0,15}')
+
         # Chase-specific patterns
         self.chase_section_patterns = {
-            'withdrawals': r'WITHDRAWALS|DEBITS|CHARGES',
-            'deposits': r'DEPOSITS|ADDITIONS|CREDITS',
-            'balance': r'BALANCE|ACCOUNT\s+SUMMARY|ENDING\s+BALANCE',
-            'transactions': r'TRANSACTIONS|ACTIVITY|SUMMARY'
+            'withdrawals': re.compile(r'WITHDRAWALS|DEBITS|CHARGES', re.IGNORECASE),
+            'deposits': re.compile(r'DEPOSITS|ADDITIONS|CREDITS', re.IGNORECASE),
+            'balance': re.compile(r'BALANCE|ACCOUNT\s+SUMMARY|ENDING\s+BALANCE', re.IGNORECASE),
+            'transactions': re.compile(r'TRANSACTIONS|ACTIVITY|SUMMARY', re.IGNORECASE)
         }
         
         # Indian bank statement patterns
         self.indian_bank_patterns = {
-            'transaction_type': r'\b(DR|CR|DEBIT|CREDIT)\b',
-            'balance': r'BALANCE\s*\(INR\)|Balance\s*\(INR\)',
-            'amount': r'Amount\s*\(INR\)',
-            'transaction_particulars': r'Transaction\s+Particulars',
-            'branch_name': r'Branch\s+Name'
+            'transaction_type': re.compile(r'\b(DR|CR|DEBIT|CREDIT)\b'),
+            'balance': re.compile(r'BALANCE\s*\(INR\)|Balance\s*\(INR\)'),
+            'amount': re.compile(r'Amount\s*\(INR\)'),
+            'transaction_particulars': re.compile(r'Transaction\s+Particulars'),
+            'branch_name': re.compile(r'Branch\s+Name')
         }
-        
-        self.chase_transaction_patterns = [
+
+        self.chase_transaction_patterns = [re.compile(p) for p in (
             # Date Description Amount
             r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([\d,]+\.?\d*)',
             # Date Description Ref Amount
             r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([A-Z0-9]+)\s+([\d,]+\.?\d*)',
             # Description Date Amount
             r'(.+?)\s+(\d{1,2}/\d{1,2}/\d{4})\s+([\d,]+\.?\d*)',
-        ]
+        )]
         
         self.currency_symbols = ['$', '€', '£', '¥', '₽', '₹', '₩', '₪', '₦', '₨', '₴', '₸', '₺', '₼', '₾', '₿']
+        # All symbols are single characters, so one pass over the line with a
+        # set beats 16 substring scans
+        self._currency_set = frozenset(self.currency_symbols)
+
+        # Bounded memo for the per-line classifiers - repeated headers and
+        # footers across pages hit the cache instead of re-running the scans.
+        # Cleared wholesale when full; races under the executor are benign
+        # because entries are pure functions of the line
+        self._skip_cache = {}
+        self._txn_look_cache = {}
+        self._LINE_CACHE_MAX = 2048
 
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF using PyPDF2"""
+        # Specialized line parsers tried (in order) before the generic
+        # cascade; bound methods resolved once instead of per line
+        self._line_parsers = (
+            self._parse_tabular_bank_data,   # better column separation
+            self._parse_indian_bank_transaction,  # DD-MM-YYYY ... DR/CR Balance Branch
+        )
+
+        # _looks_like_transaction keyword scans as compiled alternations:
+        # one C-level search per line instead of a Python loop that lowercases
+        # the line once per keyword
+        chase_transaction_keywords = [
+            'Direct Deposit', 'ATM', 'Cash', 'Deposit', 'Withdraw', 'Card Purchase',
+            'Payment Sent', 'Square Inc', 'Recurring', 'With Pin', 'CA Card', 'Confirmation',
+            'Check Deposit', 'Electronic Deposit', 'ACH', 'Credit', 'Debit', 'Purchase',
+            'Transfer', 'Online', 'PMT', 'Merchant', 'Service', 'VISA', 'Mastercard',
+            'Withdrawal', 'Transaction', 'Payment'
+        ]
+        obvious_garbage_indicators = [
+            'P O Box', 'Columbus OH', 'Deal and Hard', 'Para Espanol', 'International Calls',
+            'Congratulations', 'thanks to your', 'waived', 'monthly service fee', 'cutoff time',
+            'Eastern Time', 'Minimum Daily Balance', 'Business Complete', 'aggregated spending',
+            'NNNNNNNNNNN', 'T 1 000000000', 'DRE 021 142 30321'
+        ]
+        self._txn_keyword_probe = re.compile(
+            '|'.join(re.escape(k) for k in chase_transaction_keywords), re.IGNORECASE)
+        self._txn_garbage_probe = re.compile(
+            '|'.join(re.escape(k) for k in obvious_garbage_indicators), re.IGNORECASE)
+        self._txn_date_probe = re.compile(
+            r'\d{4}-\d{1,2}-\d{1,2}'
+            r'|\d{1,2}/\d{1,2}/\d{4}'
+            r'|(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}',
+            re.IGNORECASE)
+
+        # _parse_transaction_only patterns, hoisted here so they compile once
+        # instead of being rebuilt and cache-probed on every line
+        self._generic_date_patterns = [re.compile(p, re.IGNORECASE) for p in (
+            r'\d{4}-\d{1,2}-\d{1,2}',            # YYYY-MM-DD
+            r'\d{1,2}/\d{1,2}/\d{4}',            # MM/DD/YYYY or DD/MM/YYYY
+            r'\d{1,2}-\d{1,2}-\d{4}',            # DD-MM-YYYY (Indian format)
+            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}(?:\s+\d{4})?',  # Mon DD [YYYY]
+            r'\b\d{1,2}/\d{1,2}\b',             # MM/DD
+        )]
+        # Ordered (pattern, handler) rules; the handler unpacks that
+        # pattern's group layout into (date, description, amount, amount_raw)
+        self._txn_line_rules = [
+            (re.compile(p, re.IGNORECASE), handler) for p, handler in (
+                # MM/DD/YYYY Description Amount
+                (r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([\d,]+\.?\d*)',
+                 self._txn_date_desc_amount),
+                # Month DD Description Amount (Feb 17 ATM Cash Deposit... 9549.00)
+                (r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+?)\s+([\d,]+\.?\d*)',
+                 self._txn_month_day_desc_amount),
+                # Description Date Amount
+                (r'(.+?)\s+(\d{1,2}/\d{1,2}/\d{4})\s+([\d,]+\.?\d*)',
+                 self._txn_desc_date_amount),
+                # Date Description Ref Amount
+                (r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([A-Z0-9]+)\s+([\d,]+\.?\d*)',
+                 self._txn_date_desc_ref_amount),
+                # Month DD Description (more flexible)
+                (r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+)',
+                 self._txn_month_day_desc),
+                # Month DD Description Amount (without spaces)
+                (r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+?)([\d,]+\.?\d*)',
+                 self._txn_month_day_desc_amount),
+                # YYYY-MM-DD Description (new format)
+                (r'(\d{4}-\d{1,2}-\d{1,2})\s+(.+)',
+                 self._txn_iso_desc),
+                # Description YYYY-MM-DD (reversed)
+                (r'(.+?)\s+(\d{4}-\d{1,2}-\d{1,2})',
+                 self._txn_desc_iso),
+                # MM/DD Description Amount (no year)
+                (r'(\d{1,2}/\d{1,2})\s+(.+?)\s+([\d,]+\.?\d*)',
+                 self._txn_date_desc_amount),
+            )
+        ]
+
+    def extract_text_from_pdf(self, pdf_source) -> str:
+        """Extract text from PDF (accepts a path or a binary file-like object).
+
+        Prefers PyMuPDF when installed - its C extractor is several times
+        faster than PyPDF2's pure-Python content-stream parser and keeps a
+        better reading order. Falls back to PyPDF2 otherwise.
+        """
         try:
-            with open(pdf_path, 'rb') as file:
+            if fitz is not None:
+                if hasattr(pdf_source, 'read'):
+                    pdf_source.seek(0)
+                    doc = fitz.open(stream=pdf_source.read(), filetype='pdf')
+                else:
+                    doc = fitz.open(pdf_source)
+                try:
+                    return "\n".join(page.get_text("text") for page in doc)
+                finally:
+                    doc.close()
+            # Join once instead of growing a string page by page - repeated
+            # += on large documents is quadratic in the worst case
+            if hasattr(pdf_source, 'read'):
+                pdf_source.seek(0)
+                pdf_reader = PyPDF2.PdfReader(pdf_source)
+                return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
+            with open(pdf_source, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+                return "".join(page.extract_text() + "\n" for page in pdf_reader.pages)
         except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
+            log.warning("Error extracting text from PDF: %s", e)
             return ""
 
-    def extract_lines_with_layout(self, pdf_path: str) -> List[str]:
+    def extract_lines_with_layout(self, pdf_source) -> List[str]:
         """Extract lines using pdfplumber to preserve layout and line integrity."""
         if pdfplumber is None:
             return []
         lines: List[str] = []
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            if hasattr(pdf_source, 'read'):
+                pdf_source.seek(0)
+            with pdfplumber.open(pdf_source) as pdf:
                 for page in pdf.pages:
                     # Tight tolerances to keep columns separate but join words on the same line
                     text = page.extract_text(x_tolerance=1, y_tolerance=3) or ''
@@ -91,22 +360,28 @@ class UniversalPDFParser:
                         if line:
                             lines.append(line)
         except Exception as e:
-            print(f"Error extracting layout lines: {e}")
+            log.warning("Error extracting layout lines: %s", e)
         return lines
 
-    def parse_pdf_to_structured_data(self, pdf_path: str) -> Dict[str, Any]:
+    def parse_pdf_stream(self, data) -> Dict[str, Any]:
+        """Parse PDF passed as bytes or a binary file-like object - no temp file needed."""
+        if isinstance(data, (bytes, bytearray)):
+            data = io.BytesIO(data)
+        return self.parse_pdf_to_structured_data(data)
+
+    def parse_pdf_to_structured_data(self, pdf_source) -> Dict[str, Any]:
         """Parse PDF and return structured data with enhanced banking support"""
         try:
             # 1) Try layout-aware extraction first for best "line = Date Description Amount"
             structured_data: List[Dict[str, Any]] = []
             text: str = ""
-            layout_lines = self.extract_lines_with_layout(pdf_path)
+            layout_lines = self.extract_lines_with_layout(pdf_source)
             if layout_lines:
                 structured_data = self._extract_from_lines_with_layout(layout_lines)
-            
+
             # 2) Fallback to simple text extraction if needed
             if not structured_data:
-                text = self.extract_text_from_pdf(pdf_path)
+                text = self.extract_text_from_pdf(pdf_source)
                 if not text.strip():
                     return {'success': False, 'error': 'No text extracted from PDF'}
                 structured_data = self._extract_structured_data_enhanced(text)
@@ -145,7 +420,7 @@ class UniversalPDFParser:
             detected_section = self._detect_banking_section(line)
             if detected_section:
                 current_section = detected_section
-                print(f"🔍 Detected section: {current_section}")
+                log.debug("Detected section: %s", current_section)
                 continue
             
             # Only process lines that look like transactions
@@ -154,19 +429,7 @@ class UniversalPDFParser:
                 if parsed_line:
                     structured_data.append(parsed_line)
         
-        # Keep only rows that have both a date and a non-zero amount
-        filtered = []
-        for row in structured_data:
-            date_str = str(row.get('date') or '').strip()
-            amount_val = row.get('amount')
-            try:
-                amount_num = float(amount_val) if amount_val is not None else 0.0
-            except Exception:
-                amount_num = 0.0
-            if date_str and amount_num != 0.0:
-                filtered.append(row)
-        
-        return filtered
+        return self._filter_valid_transactions(structured_data)
 
     def _extract_from_lines_with_layout(self, lines: List[str]) -> List[Dict[str, Any]]:
         """Parse already line-broken text (layout-aware) into structured transactions only."""
@@ -186,9 +449,12 @@ class UniversalPDFParser:
                 parsed_line = self._parse_transaction_only(line, current_section, line_num)
                 if parsed_line:
                     structured_data.append(parsed_line)
-        # Keep only rows that have both a date and a non-zero amount
+        return self._filter_valid_transactions(structured_data)
+
+    def _filter_valid_transactions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep only rows that have both a date and a non-zero amount."""
         filtered: List[Dict[str, Any]] = []
-        for row in structured_data:
+        for row in rows:
             date_str = str(row.get('date') or '').strip()
             amount_val = row.get('amount')
             try:
@@ -199,12 +465,8 @@ class UniversalPDFParser:
                 filtered.append(row)
         return filtered
 
-    def _is_non_transaction_line(self, line: str) -> bool:
-        """Check if line should be skipped - comprehensive filtering for Chase statements"""
-        line_upper = line.upper()
-        
-        # Skip these types of lines - comprehensive filtering
-        skip_patterns = [
+    # Skip these types of lines - comprehensive filtering for Chase statements
+    _SKIP_PATTERN_STRINGS = [
             # Page and document info
             r'^PAGE\s+\d+$',  # Page numbers
             r'^ACCOUNT\s+SUMMARY$',  # Account summary headers
@@ -251,73 +513,65 @@ class UniversalPDFParser:
             r'^[A-Z\s]{20,}$',  # Very long all caps text
             r'^[A-Z\s]+\d{5,}',  # Text followed by many numbers
         ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, line_upper, re.IGNORECASE):
-                return True
-        
-        return False
+    # One combined alternation: a single scan over the line instead of ~35.
+    # The anchored alternatives keep their ^ semantics inside the group.
+    _SKIP_COMBINED = re.compile(
+        '|'.join(f'(?:{p})' for p in _SKIP_PATTERN_STRINGS), re.IGNORECASE)
+
+    def _is_non_transaction_line(self, line: str) -> bool:
+        """Check if line should be skipped - comprehensive filtering for Chase statements"""
+        cached = self._skip_cache.get(line)
+        if cached is None:
+            # IGNORECASE already covers casing - no need to copy the line uppercased
+            cached = self._SKIP_COMBINED.search(line) is not None
+            if len(self._skip_cache) >= self._LINE_CACHE_MAX:
+                self._skip_cache.clear()
+            self._skip_cache[line] = cached
+        return cached
 
     def _looks_like_transaction(self, line: str) -> bool:
         """Check if line looks like a transaction - balanced filtering for Chase"""
+        cached = self._txn_look_cache.get(line)
+        if cached is None:
+            cached = self._looks_like_transaction_uncached(line)
+            if len(self._txn_look_cache) >= self._LINE_CACHE_MAX:
+                self._txn_look_cache.clear()
+            self._txn_look_cache[line] = cached
+        return cached
+
+    def _looks_like_transaction_uncached(self, line: str) -> bool:
         # Must have sufficient text for a real transaction
-        has_text = len(line.split()) >= 3  # At least 3 words (reduced from 4)
-        
-        # Must have EITHER a valid date format OR Chase keywords (not both required)
-        has_valid_date = bool(re.search(r'\d{4}-\d{1,2}-\d{1,2}', line)) or \
-                        bool(re.search(r'\d{1,2}/\d{1,2}/\d{4}', line)) or \
-                        bool(re.search(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}', line, re.IGNORECASE))
-        
-        # Must have Chase transaction keywords
-        chase_transaction_keywords = [
-            'Direct Deposit', 'ATM', 'Cash', 'Deposit', 'Withdraw', 'Card Purchase', 
-            'Payment Sent', 'Square Inc', 'Recurring', 'With Pin', 'CA Card', 'Confirmation',
-            'Check Deposit', 'Electronic Deposit', 'ACH', 'Credit', 'Debit', 'Purchase',
-            'Transfer', 'Online', 'PMT', 'Merchant', 'Service', 'VISA', 'Mastercard',
-            'Deposit', 'Withdrawal', 'Transaction', 'Purchase', 'Payment', 'Transfer'
-        ]
-        has_chase_keywords = any(keyword.lower() in line.lower() for keyword in chase_transaction_keywords)
-        
+        if len(line) < 5 or len(line.split()) < 3:  # At least 3 words (reduced from 4)
+            return False
+
+        # Must have EITHER a valid date format OR Chase keywords (not both
+        # required); skip the keyword scan when a date already matched
+        if not self._txn_date_probe.search(line) and not self._txn_keyword_probe.search(line):
+            return False
+
         # Must NOT contain obvious garbage indicators
-        obvious_garbage_indicators = [
-            'P O Box', 'Columbus OH', 'Deal and Hard', 'Para Espanol', 'International Calls',
-            'Congratulations', 'thanks to your', 'waived', 'monthly service fee', 'cutoff time',
-            'Eastern Time', 'Minimum Daily Balance', 'Business Complete', 'aggregated spending',
-            'NNNNNNNNNNN', 'T 1 000000000', 'DRE 021 142 30321'
-        ]
-        has_obvious_garbage = any(indicator.lower() in line.lower() for indicator in obvious_garbage_indicators)
-        
-        # Line is a transaction if it has text AND (valid date OR Chase keywords) AND NO obvious garbage
-        return has_text and (has_valid_date or has_chase_keywords) and not has_obvious_garbage
+        return not self._txn_garbage_probe.search(line)
 
     def _parse_transaction_only(self, line: str, section: str, line_num: int) -> Optional[Dict[str, Any]]:
         """Parse transaction data - enhanced for Chase statements and Indian bank statements with improved column matching"""
 
-        # First, try tabular bank data parsing (handles better column separation)
-        tabular_result = self._parse_tabular_bank_data(line, section, line_num)
-        if tabular_result:
-            return tabular_result
-
-        # Second, try Indian bank statement format (DD-MM-YYYY Description Amount DR/CR Balance Branch)
-        indian_result = self._parse_indian_bank_transaction(line, section, line_num)
-        if indian_result:
-            return indian_result
+        # Try the specialized parsers first (tabular, then Indian bank format)
+        for parse in self._line_parsers:
+            result = parse(line, section, line_num)
+            if result:
+                return result
 
         # Enhanced approach: better date detection and amount extraction
         date_match = None
-        date_patterns_generic = [
-            r'\d{4}-\d{1,2}-\d{1,2}',            # YYYY-MM-DD
-            r'\d{1,2}/\d{1,2}/\d{4}',            # MM/DD/YYYY or DD/MM/YYYY
-            r'\d{1,2}-\d{1,2}-\d{4}',            # DD-MM-YYYY (Indian format)
-            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}(?:\s+\d{4})?',  # Mon DD [YYYY]
-            r'\b\d{1,2}/\d{1,2}\b',             # MM/DD
-        ]
-        
-        # Find the first valid date match
-        for pat in date_patterns_generic:
-            m = re.search(pat, line, re.IGNORECASE)
+        date_pattern_idx = -1
+
+        # Find the first valid date match, remembering which pattern hit so
+        # normalization can skip re-detecting the format
+        for idx, pat in enumerate(self._generic_date_patterns):
+            m = pat.search(line)
             if m:
                 date_match = m
+                date_pattern_idx = idx
                 break
         
         # Enhanced amount extraction - look for the last valid currency amount
@@ -325,7 +579,7 @@ class UniversalPDFParser:
         
         if date_match and last_amount_str:
             raw_date = date_match.group(0)
-            parsed_date = self._format_date(raw_date)
+            parsed_date = self._normalize_matched_date(raw_date, date_pattern_idx)
             
             # Better description extraction - remove date and amount, keep the middle
             description = line
@@ -337,7 +591,7 @@ class UniversalPDFParser:
                 description = description[:amount_idx] + description[amount_idx + len(last_amount_str):]
             
             # Clean up the description
-            description = re.sub(r'\s+', ' ', description).strip()
+            description = self._ws_re.sub(' ', description).strip()
             
             # Validate that we have meaningful data
             if len(description) < 3:  # Too short description
@@ -353,149 +607,68 @@ class UniversalPDFParser:
                 'full_text': line
             }
 
-        # Enhanced transaction patterns for Chase
-        transaction_patterns = [
-            # 0: MM/DD/YYYY Description Amount
-            r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([\d,]+\.?\d*)',
-            # 1: Month DD Description Amount (Feb 17 ATM Cash Deposit... 9549.00)
-            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+?)\s+([\d,]+\.?\d*)',
-            # 2: Description Date Amount
-            r'(.+?)\s+(\d{1,2}/\d{1,2}/\d{4})\s+([\d,]+\.?\d*)',
-            # 3: Date Description Ref Amount
-            r'(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+([A-Z0-9]+)\s+([\d,]+\.?\d*)',
-            # 4: Month DD Description (more flexible)
-            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+)',
-            # 5: Month DD Description Amount (without spaces)
-            r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})\s+(.+?)([\d,]+\.?\d*)',
-            # 6: YYYY-MM-DD Description (new format)
-            r'(\d{4}-\d{1,2}-\d{1,2})\s+(.+)',
-            # 7: Description YYYY-MM-DD (reversed)
-            r'(.+?)\s+(\d{4}-\d{1,2}-\d{1,2})',
-            # 8: MM/DD Description Amount (no year)
-            r'(\d{1,2}/\d{1,2})\s+(.+?)\s+([\d,]+\.?\d*)',
-        ]
-        
-        for idx, pattern in enumerate(transaction_patterns):
-            match = re.search(pattern, line, re.IGNORECASE)
+        # Enhanced transaction patterns for Chase (rules built in __init__)
+        for pattern, handler in self._txn_line_rules:
+            match = pattern.search(line)
             if not match:
                 continue
-            groups = match.groups()
-            
-            if idx == 0:  # MM/DD/YYYY Description Amount
-                date, description, amount = groups
-                parsed_date = self._format_date(date.strip())
-                return {
-                    'date': parsed_date,
-                    'description': description.strip(),
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 1:  # Month DD Description Amount
-                month, day, description, amount = groups
-                date = self._convert_month_day_to_date(month, day)
-                return {
-                    'date': self._format_date(date),
-                    'description': description.strip(),
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 2:  # Description Date Amount
-                description, date, amount = groups
-                return {
-                    'date': self._format_date(date.strip()),
-                    'description': description.strip(),
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 3:  # Date Description Ref Amount
-                date, description, ref, amount = groups
-                return {
-                    'date': self._format_date(date.strip()),
-                    'description': f"{description.strip()} (Ref: {ref.strip()})",
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 4:  # Month DD Description (find amount later)
-                month, day, description = groups
-                date = self._convert_month_day_to_date(month, day)
-                amount = self._extract_amount_from_text(description)
-                return {
-                    'date': self._format_date(date),
-                    'description': description.strip(),
-                    'amount': amount,
-                    'amount_raw': str(amount),
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 5:  # Month DD Description Amount (tight)
-                month, day, description, amount = groups
-                date = self._convert_month_day_to_date(month, day)
-                return {
-                    'date': self._format_date(date),
-                    'description': description.strip(),
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 6:  # YYYY-MM-DD Description
-                date, description = groups
-                amount = self._extract_amount_from_text(description)
-                return {
-                    'date': self._format_date(date),
-                    'description': description.strip(),
-                    'amount': amount,
-                    'amount_raw': str(amount),
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 7:  # Description YYYY-MM-DD
-                description, date = groups
-                amount = self._extract_amount_from_text(description)
-                return {
-                    'date': self._format_date(date),
-                    'description': description.strip(),
-                    'amount': amount,
-                    'amount_raw': str(amount),
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-            if idx == 8:  # MM/DD Description Amount (no year)
-                mmdd, description, amount = groups
-                date = self._format_date(mmdd)
-                return {
-                    'date': date,
-                    'description': description.strip(),
-                    'amount': self._parse_amount(amount),
-                    'amount_raw': amount,
-                    'section': section,
-                    'line_number': line_num,
-                    'full_text': line
-                }
-        
+            date, description, amount, amount_raw = handler(match.groups())
+            return {
+                'date': date,
+                'description': description,
+                'amount': amount,
+                'amount_raw': amount_raw,
+                'section': section,
+                'line_number': line_num,
+                'full_text': line
+            }
+
         # If no pattern matches, try to extract what we can
         return self._extract_fallback_transaction(line, section, line_num)
 
+    # Group-layout handlers for _txn_line_rules; each returns
+    # (date, description, amount, amount_raw)
+    def _txn_date_desc_amount(self, groups):
+        date, description, amount = groups
+        return self._format_date(date.strip()), description.strip(), self._parse_amount(amount), amount
+
+    def _txn_month_day_desc_amount(self, groups):
+        month, day, description, amount = groups
+        date = self._convert_month_day_to_date(month, day)
+        return self._format_date(date), description.strip(), self._parse_amount(amount), amount
+
+    def _txn_desc_date_amount(self, groups):
+        description, date, amount = groups
+        return self._format_date(date.strip()), description.strip(), self._parse_amount(amount), amount
+
+    def _txn_date_desc_ref_amount(self, groups):
+        date, description, ref, amount = groups
+        return (self._format_date(date.strip()),
+                f"{description.strip()} (Ref: {ref.strip()})",
+                self._parse_amount(amount), amount)
+
+    def _txn_month_day_desc(self, groups):
+        month, day, description = groups
+        date = self._convert_month_day_to_date(month, day)
+        amount = self._extract_amount_from_text(description)
+        return self._format_date(date), description.strip(), amount, str(amount)
+
+    def _txn_iso_desc(self, groups):
+        date, description = groups
+        amount = self._extract_amount_from_text(description)
+        return self._format_date(date), description.strip(), amount, str(amount)
+
+    def _txn_desc_iso(self, groups):
+        description, date = groups
+        amount = self._extract_amount_from_text(description)
+        return self._format_date(date), description.strip(), amount, str(amount)
+
     def _extract_amount_from_text(self, text: str) -> float:
         """Extract amount from text - prefer the LAST currency-like number on the line."""
+        if not self._digit_probe.search(text):
+            return 0.0
         # Match currency-like numbers including optional $ and parentheses for negatives
-        matches = re.findall(r'(\(?-?\$?[\d,]+(?:\.\d{2})?\)?)', text)
+        matches = self._currency_num_re.findall(text)
         if not matches:
             return 0.0
         last = matches[-1]
@@ -503,24 +676,19 @@ class UniversalPDFParser:
 
     def _find_last_amount_string(self, text: str) -> str:
         """Return the last currency-like number substring from text with improved detection."""
-        # Enhanced patterns for better currency detection
-        patterns = [
-            r'\(?-?\$?[\d,]+(?:\.\d{2})?\)?',  # Standard currency format
-            r'\(?-?[\d,]+(?:\.\d{2})?\)?',      # Numbers with parentheses for negatives
-            r'-?\$?[\d,]+(?:\.\d{2})?',         # Standard positive/negative amounts
-            r'[\d,]+(?:\.\d{2})?',              # Just numbers with commas and decimals
-        ]
-        
+        if not self._digit_probe.search(text):
+            return ''
+
+        # Enhanced patterns for better currency detection (compiled in __init__)
         all_matches = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            all_matches.extend(matches)
+        for pattern in self._amount_candidate_patterns:
+            all_matches.extend(pattern.findall(text))
         
         # Filter out very small numbers that are likely not amounts (like years, reference numbers)
         valid_matches = []
         for match in all_matches:
             # Clean the match to get just the number
-            clean_match = re.sub(r'[^\d.,-]', '', match)
+            clean_match = _AMOUNT_JUNK_RE.sub('', match)
             try:
                 # Remove commas and convert to float
                 num_value = float(clean_match.replace(',', ''))
@@ -534,63 +702,34 @@ class UniversalPDFParser:
 
     def _format_date(self, date_str: str) -> str:
         """Format date to YYYY-MM-DD format with improved DD-MM-YYYY support"""
-        try:
-            # Handle DD-MM-YYYY format (Indian bank statements)
-            if re.match(r'^\d{1,2}-\d{1,2}-\d{4}$', date_str):
-                day, month, year = date_str.split('-')
-                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Handle DD/MM/YYYY format
-            if re.match(r'\d{1,2}/\d{1,2}/\d{4}', date_str):
-                parts = date_str.split('/')
-                # Check if it's likely DD/MM/YYYY (day > 12) or MM/DD/YYYY (month > 12)
-                if len(parts) == 3:
-                    first, second, year = parts
-                    if int(first) > 12:  # First part is day (DD/MM/YYYY)
-                        day, month = first, second
-                    else:  # First part is month (MM/DD/YYYY)
-                        month, day = first, second
-                    return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Handle MM/DD/YYYY format (US format)
-            if re.match(r'^\d{1,2}/\d{1,2}/\d{4}$', date_str):
-                month, day, year = date_str.split('/')
-                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Handle MM/DD without year -> assume current year
-            if re.match(r'^\d{1,2}/\d{1,2}$', date_str):
-                month, day = date_str.split('/')
-                year = str(pd.Timestamp.now().year)
-                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+        return _format_date_cached(date_str)
 
-            # Handle MM-DD-YYYY (US format)
-            if re.match(r'^\d{1,2}-\d{1,2}-\d{4}$', date_str):
-                month, day, year = date_str.split('-')
-                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+    def _normalize_matched_date(self, raw: str, pattern_idx: int) -> str:
+        """Normalize a date already matched by _generic_date_patterns.
 
-            # Handle MM-DD without year -> assume current year
-            if re.match(r'^\d{1,2}-\d{1,2}$', date_str):
-                month, day = date_str.split('-')
-                year = str(pd.Timestamp.now().year)
+        The pattern index pins down the format, so these cases are plain
+        string splits instead of re-running the _format_date cascade.
+        """
+        try:
+            if pattern_idx == 0:  # YYYY-MM-DD - already normalized
+                return raw
+            if pattern_idx == 1:  # MM/DD/YYYY or DD/MM/YYYY
+                first, second, year = raw.split('/')
+                if int(first) > 12:  # First part is day (DD/MM/YYYY)
+                    day, month = first, second
+                else:  # First part is month (MM/DD/YYYY)
+                    month, day = first, second
                 return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Handle YYYY-MM-DD format (already correct)
-            elif re.match(r'\d{4}-\d{1,2}-\d{1,2}', date_str):
-                return date_str
-            
-            # Handle other formats - try to parse
-            else:
-                # Normalize month names (short/full) and remove commas
-                normalized = re.sub(r',', '', date_str).strip()
-                # Try pandas to_datetime for various formats
-                parsed_date = pd.to_datetime(normalized, errors='coerce')
-                if pd.notna(parsed_date):
-                    return parsed_date.strftime('%Y-%m-%d')
-                
-        except Exception as e:
-            print(f"Error formatting date {date_str}: {e}")
-        
-        return date_str
+            if pattern_idx == 2:  # DD-MM-YYYY (Indian format)
+                day, month, year = raw.split('-')
+                return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+            if pattern_idx == 4:  # MM/DD without year -> assume current year
+                month, day = raw.split('/')
+                return f"{pd.Timestamp.now().year}-{month.zfill(2)}-{day.zfill(2)}"
+        except Exception:
+            pass
+        # Month-name formats (and anything unexpected) take the full path
+        return self._format_date(raw)
 
     def _convert_month_day_to_date(self, month: str, day: str) -> str:
         """Convert month abbreviation and day to YYYY-MM-DD format"""
@@ -613,10 +752,10 @@ class UniversalPDFParser:
             return None
             
         # Try to find any date and amount - enhanced date detection
-        date_match = re.search(r'\d{1,2}[/-]\d{1,2}[/-]\d{4}', line)
-        month_match = re.search(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2})', line, re.IGNORECASE)
-        yyyy_mm_dd_match = re.search(r'\d{4}-\d{1,2}-\d{1,2}', line)
-        amount_match = re.search(r'[\d,]+\.?\d*', line)
+        date_match = self._slashdash_date_re.search(line)
+        month_match = self._mon_dd_re.search(line)
+        yyyy_mm_dd_match = self._iso_date_re.search(line)
+        amount_match = self._num_re.search(line)
         
         # If we have any date-like pattern and some text, create a transaction
         if (date_match or month_match or yyyy_mm_dd_match) and len(line.split()) >= 3:
@@ -633,17 +772,17 @@ class UniversalPDFParser:
             # Improved amount extraction
             amount = self._extract_amount_from_text(line) if not amount_match else self._parse_amount(amount_match.group())
             
-            # Remove date and amount from line to get description
-            description = line
-            if date_match:
-                description = description.replace(date_match.group(), '')
-            elif month_match:
-                description = description.replace(month_match.group(), '')
-            elif yyyy_mm_dd_match:
-                description = description.replace(yyyy_mm_dd_match.group(), '')
+            # Remove date and amount from line to get description; the date
+            # is cut by its match span instead of re-scanning with replace
+            used_match = date_match or month_match or yyyy_mm_dd_match
+            if used_match:
+                start, end = used_match.span()
+                description = line[:start] + line[end:]
+            else:
+                description = line
             if amount_match:
                 description = description.replace(amount_match.group(), '')
-            description = re.sub(r'\s+', ' ', description.strip())  # Clean up extra spaces
+            description = self._ws_re.sub(' ', description.strip())  # Clean up extra spaces
             
             return {
                 'date': self._format_date(date),
@@ -680,9 +819,7 @@ class UniversalPDFParser:
         
         # Enhanced pattern that handles various spacing and separators
         # This pattern looks for: DD-MM-YYYY + description + amount + DR/CR + balance + branch
-        indian_pattern = r'(\d{1,2}-\d{1,2}-\d{4})\s+(.+?)\s+([\d,]+\.?\d{2})\s+(DR|CR)\s+([\d,]+\.?\d{2})\s+(.+)'
-        
-        match = re.search(indian_pattern, line)
+        match = self._indian_txn_re.search(line)
         if match:
             date, description, amount, trans_type, balance, branch = match.groups()
             
@@ -701,8 +838,7 @@ class UniversalPDFParser:
             }
         
         # Alternative pattern without branch
-        indian_pattern_no_branch = r'(\d{1,2}-\d{1,2}-\d{4})\s+(.+?)\s+([\d,]+\.?\d{2})\s+(DR|CR)\s+([\d,]+\.?\d{2})'
-        match = re.search(indian_pattern_no_branch, line)
+        match = self._indian_txn_no_branch_re.search(line)
         if match:
             date, description, amount, trans_type, balance = match.groups()
             
@@ -725,20 +861,20 @@ class UniversalPDFParser:
         # This handles cases where spacing might be irregular
         
         # Find date first
-        date_match = re.search(r'(\d{1,2}-\d{1,2}-\d{4})', line)
+        date_match = self._dmy_date_re.search(line)
         if not date_match:
             return None
-        
+
         date = date_match.group(1)
         remaining_line = line[date_match.end():].strip()
-        
+
         # Find all amounts in the remaining line
-        amounts = re.findall(r'([\d,]+\.?\d{2})', remaining_line)
+        amounts = self._amount_2dp_re.findall(remaining_line)
         if len(amounts) < 2:  # Need at least amount and balance
             return None
-        
+
         # Find transaction type (DR/CR)
-        type_match = re.search(r'\b(DR|CR)\b', remaining_line)
+        type_match = self._drcr_re.search(remaining_line)
         if not type_match:
             return None
         
@@ -753,7 +889,7 @@ class UniversalPDFParser:
         balance_branch_part = parts[1].strip()
         
         # Extract amounts from description part (should be the main transaction amount)
-        desc_amounts = re.findall(r'([\d,]+\.?\d{2})', description_part)
+        desc_amounts = self._amount_2dp_re.findall(description_part)
         if desc_amounts:
             amount = desc_amounts[-1]  # Take the last amount in description
             # Remove the amount from description
@@ -763,7 +899,7 @@ class UniversalPDFParser:
             description = description_part
         
         # Extract balance from balance_branch_part
-        balance_amounts = re.findall(r'([\d,]+\.?\d{2})', balance_branch_part)
+        balance_amounts = self._amount_2dp_re.findall(balance_branch_part)
         if balance_amounts:
             balance = balance_amounts[0]  # First amount after DR/CR should be balance
             # Remove balance from the part to get branch
@@ -825,18 +961,18 @@ class UniversalPDFParser:
         # Look for the structure with multiple decimal amounts
         
         # Find all decimal amounts in the line
-        amounts = re.findall(r'([\d,]+\.?\d{2})', line)
+        amounts = self._amount_2dp_re.findall(line)
         if len(amounts) >= 2:  # Need at least transaction amount and balance
-            
+
             # Find date
-            date_match = re.search(r'(\d{1,2}-\d{1,2}-\d{4})', line)
+            date_match = self._dmy_date_re.search(line)
             if not date_match:
                 return None
-            
+
             date = date_match.group(1)
-            
+
             # Find transaction type
-            type_match = re.search(r'\b(DR|CR)\b', line)
+            type_match = self._drcr_re.search(line)
             if not type_match:
                 return None
             
@@ -855,7 +991,7 @@ class UniversalPDFParser:
             before_type_clean = before_type.replace(date, '').strip()
             
             # Find amount in before_type_clean
-            before_amounts = re.findall(r'([\d,]+\.?\d{2})', before_type_clean)
+            before_amounts = self._amount_2dp_re.findall(before_type_clean)
             if before_amounts:
                 amount = before_amounts[-1]  # Last amount should be transaction amount
                 description = before_type_clean.replace(amount, '').strip()
@@ -864,7 +1000,7 @@ class UniversalPDFParser:
                 description = before_type_clean
             
             # Extract balance and branch from after_type part
-            after_amounts = re.findall(r'([\d,]+\.?\d{2})', after_type)
+            after_amounts = self._amount_2dp_re.findall(after_type)
             if after_amounts:
                 balance = after_amounts[0]  # First amount after type should be balance
                 branch = after_type.replace(balance, '').strip()
@@ -890,10 +1026,9 @@ class UniversalPDFParser:
 
     def _detect_banking_section(self, line: str) -> Optional[str]:
         """Detect banking document sections"""
-        line_upper = line.upper()
-        
+        # Patterns are compiled with IGNORECASE - match the line as-is
         for section, pattern in self.chase_section_patterns.items():
-            if re.search(pattern, line_upper, re.IGNORECASE):
+            if pattern.search(line):
                 return section
         
         return None
@@ -910,7 +1045,7 @@ class UniversalPDFParser:
     def _parse_transaction_line(self, line: str, section: str) -> Optional[Dict[str, Any]]:
         """Parse transaction lines (withdrawals/deposits) - improved amount extraction"""
         for pattern in self.chase_transaction_patterns:
-            match = re.search(pattern, line)
+            match = pattern.search(line)
             if match:
                 groups = match.groups()
                 
@@ -949,7 +1084,7 @@ class UniversalPDFParser:
     def _parse_balance_line(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse balance-related lines"""
         # Look for balance amounts
-        amount_match = re.search(r'[\d,]+\.?\d*', line)
+        amount_match = self._num_re.search(line)
         if amount_match:
             return {
                 'transaction_type': 'balance',
@@ -967,29 +1102,21 @@ class UniversalPDFParser:
 
     def _parse_general_line(self, line: str, line_num: int) -> Dict[str, Any]:
         """Parse general lines with enhanced banking support"""
-        # Extract amounts
-        amounts = []
-        for pattern in self.amount_patterns:
-            found = re.findall(pattern, line)
-            amounts.extend(found)
-        
-        # Extract dates
-        dates = []
-        for pattern in self.date_patterns:
-            found = re.findall(pattern, line)
-            dates.extend(found)
-        
+        # Extract amounts and dates - one combined-alternation sweep each
+        amounts = self.amount_combined.findall(line)
+        dates = self.date_combined.findall(line)
+
         # Extract emails
-        emails = re.findall(self.email_pattern, line)
-        
+        emails = self.email_pattern.findall(line)
+
         # Extract phones
-        phones = re.findall(self.phone_pattern, line)
+        phones = self.phone_pattern.findall(line)
         
-        # Check for currency symbols
-        has_currency = any(symbol in line for symbol in self.currency_symbols)
+        # Check for currency symbols (single set pass, see __init__)
+        has_currency = not self._currency_set.isdisjoint(line)
         
         # Check for numbers
-        has_numbers = bool(re.search(r'\d', line))
+        has_numbers = bool(self._digit_probe.search(line))
         
         # Word count
         word_count = len(line.split())
@@ -1015,22 +1142,7 @@ class UniversalPDFParser:
 
     def _parse_amount(self, amount_str: str) -> float:
         """Parse amount string to float"""
-        try:
-            s = amount_str.strip()
-            # Parentheses mean negative
-            is_negative = s.startswith('(') and s.endswith(')')
-            # Remove everything except digits, comma, dot, minus
-            cleaned = re.sub(r'[^\d.,-]', '', s)
-            # Remove thousands separators
-            cleaned = cleaned.replace(',', '')
-            if cleaned.count('-') > 1:
-                cleaned = cleaned.replace('-', '', cleaned.count('-') - 1)
-            value = float(cleaned) if cleaned else 0.0
-            if is_negative and value > 0:
-                value = -value
-            return value
-        except:
-            return 0.0
+        return _parse_amount_cached(amount_str)
 
     def create_dataframe(self, data: List[Dict[str, Any]]) -> pd.DataFrame:
         """Create DataFrame with only essential columns: Date, Description, Amount - enhanced formatting and validation"""
@@ -1062,48 +1174,41 @@ class UniversalPDFParser:
         # Handle NaN values and empty strings
         clean_df = clean_df.fillna('')
         
-        # Data validation and cleaning
+        # Data validation and cleaning - vectorized column ops instead of
+        # per-row .apply lambdas
         if 'Date' in clean_df.columns:
-            # Ensure dates are properly formatted strings
-            clean_df['Date'] = clean_df['Date'].astype(str)
-            # Replace empty or invalid dates
-            clean_df['Date'] = clean_df['Date'].apply(lambda x: '' if x in ['', 'nan', 'None'] else x)
-        
+            # Ensure dates are properly formatted strings; blank out invalid ones
+            clean_df['Date'] = clean_df['Date'].astype(str).replace({'nan': '', 'None': ''})
+
         if 'Description' in clean_df.columns:
-            # Clean descriptions
-            clean_df['Description'] = clean_df['Description'].astype(str)
-            clean_df['Description'] = clean_df['Description'].apply(lambda x: x.strip() if x and x != 'nan' else '')
-            # Replace empty descriptions
-            clean_df['Description'] = clean_df['Description'].apply(lambda x: 'Transaction' if not x or x == '' else x)
-        
+            # Clean descriptions; empty ones become the 'Transaction' placeholder
+            desc = clean_df['Description'].astype(str)
+            desc = desc.str.strip().mask(desc.eq('nan'), '')
+            clean_df['Description'] = desc.mask(desc.eq(''), 'Transaction')
+
         if 'Amount' in clean_df.columns:
             # Convert amount to numeric with better error handling
-            clean_df['Amount'] = pd.to_numeric(clean_df['Amount'], errors='coerce').fillna(0)
-            
+            amount = pd.to_numeric(clean_df['Amount'], errors='coerce').fillna(0)
             # Validate amounts (remove obviously wrong values)
-            clean_df['Amount'] = clean_df['Amount'].apply(lambda x: 0 if abs(x) > 999999.99 or (x != 0 and abs(x) < 0.01) else x)
-            
-            # Format amounts with commas and 2 decimal places
-            clean_df['Amount'] = clean_df['Amount'].apply(
-                lambda x: f"{x:,.2f}" if x != 0 else "0.00"
-            )
-        
+            amount_abs = amount.abs()
+            amount = amount.mask((amount_abs > 999999.99) | ((amount != 0) & (amount_abs < 0.01)), 0)
+            # Format amounts with commas and 2 decimal places (+0.0 folds -0.0)
+            clean_df['Amount'] = (amount + 0.0).map('{:,.2f}'.format)
+
         if 'Type' in clean_df.columns:
             # Clean transaction type (DR/CR)
-            clean_df['Type'] = clean_df['Type'].astype(str)
-            clean_df['Type'] = clean_df['Type'].apply(lambda x: x.strip().upper() if x and x != 'nan' else '')
-        
+            type_col = clean_df['Type'].astype(str)
+            clean_df['Type'] = type_col.str.strip().str.upper().mask(type_col.eq('nan'), '')
+
         if 'Balance' in clean_df.columns:
             # Convert balance to numeric and format
-            clean_df['Balance'] = pd.to_numeric(clean_df['Balance'], errors='coerce').fillna(0)
-            clean_df['Balance'] = clean_df['Balance'].apply(
-                lambda x: f"{x:,.2f}" if x != 0 else "0.00"
-            )
-        
+            balance = pd.to_numeric(clean_df['Balance'], errors='coerce').fillna(0)
+            clean_df['Balance'] = (balance + 0.0).map('{:,.2f}'.format)
+
         if 'Branch' in clean_df.columns:
             # Clean branch names
-            clean_df['Branch'] = clean_df['Branch'].astype(str)
-            clean_df['Branch'] = clean_df['Branch'].apply(lambda x: x.strip() if x and x != 'nan' else '')
+            branch = clean_df['Branch'].astype(str)
+            clean_df['Branch'] = branch.str.strip().mask(branch.eq('nan'), '')
         
         # Final validation: remove rows where all essential fields are empty
         if len(clean_df) > 0:
@@ -1126,10 +1231,10 @@ class UniversalPDFParser:
             # If Date column contains non-date data, try to fix it
             if 'Date' in fixed_df.columns:
                 date_val = str(row['Date']).strip()
-                if date_val and not re.match(r'\d{4}-\d{2}-\d{2}', date_val):
+                if date_val and not self._iso_strict_re.match(date_val):
                     # Try to extract a proper date from the description
                     desc = str(row['Description']).strip()
-                    date_match = re.search(r'\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}-\d{1,2}-\d{4}', desc)
+                    date_match = self._any_date_re.search(desc)
                     if date_match:
                         fixed_df.at[idx, 'Date'] = self._format_date(date_match.group())
                         # Remove the date from description
@@ -1138,7 +1243,7 @@ class UniversalPDFParser:
             # If Amount column contains non-numeric data, try to fix it
             if 'Amount' in fixed_df.columns:
                 amount_val = str(row['Amount']).strip()
-                if amount_val and not re.match(r'[\d,]+\.?\d{2}', amount_val):
+                if amount_val and not self._amount_2dp_re.match(amount_val):
                     # Try to extract amount from description
                     desc = str(row['Description']).strip()
                     amount_match = self._find_last_amount_string(desc)
@@ -1152,7 +1257,7 @@ class UniversalPDFParser:
                 type_val = str(row['Type']).strip()
                 if not type_val or type_val == '':
                     desc = str(row['Description']).strip()
-                    type_match = re.search(r'\b(DR|CR|DEBIT|CREDIT)\b', desc, re.IGNORECASE)
+                    type_match = self._type_word_re.search(desc)
                     if type_match:
                         fixed_df.at[idx, 'Type'] = type_match.group().upper()
                         # Remove the type from description
@@ -1164,7 +1269,7 @@ class UniversalPDFParser:
                 if not balance_val or balance_val == '0.00':
                     desc = str(row['Description']).strip()
                     # Look for balance pattern (large number that could be balance)
-                    balance_matches = re.findall(r'[\d,]+\.?\d{2}', desc)
+                    balance_matches = self._amount_2dp_re.findall(desc)
                     if balance_matches:
                         # Take the last large number as potential balance
                         for match in reversed(balance_matches):
@@ -1190,10 +1295,17 @@ class UniversalPDFParser:
         if not filename:
             filename = f"enhanced_pdf_data_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        # xlsxwriter in constant_memory mode streams rows to disk instead of
+        # holding an object per cell like openpyxl; fall back if unavailable
+        try:
+            writer_ctx = pd.ExcelWriter(filename, engine='xlsxwriter',
+                                        engine_kwargs={'options': {'constant_memory': True}})
+        except ImportError:
+            writer_ctx = pd.ExcelWriter(filename, engine='openpyxl')
+        with writer_ctx as writer:
             # Only main data sheet - no extra sheets
             df.to_excel(writer, sheet_name='Extracted Data', index=False)
-        
+
         return filename
 
     def _create_banking_summary_sheet(self, writer, df: pd.DataFrame):
@@ -1212,20 +1324,22 @@ class UniversalPDFParser:
             for trans_type, count in type_counts.items():
                 summary_data.append(['Transaction Type', trans_type, count])
         
-        # Amount statistics
+        # Amount statistics - one aggregation pass instead of four
         if 'amount' in df.columns:
             amounts = pd.to_numeric(df['amount'], errors='coerce').dropna()
             if not amounts.empty:
+                stats = amounts.agg(['sum', 'mean', 'max', 'min'])
                 summary_data.extend([
-                    ['Total Amount', 'Sum', amounts.sum()],
-                    ['Average Amount', 'Mean', amounts.mean()],
-                    ['Largest Amount', 'Max', amounts.max()],
-                    ['Smallest Amount', 'Min', amounts.min()]
+                    ['Total Amount', 'Sum', stats['sum']],
+                    ['Average Amount', 'Mean', stats['mean']],
+                    ['Largest Amount', 'Max', stats['max']],
+                    ['Smallest Amount', 'Min', stats['min']]
                 ])
         
-        # Date range
+        # Date range - dates are normalized to YYYY-MM-DD upstream, so a
+        # fixed format skips pandas' per-value format inference
         if 'date' in df.columns:
-            valid_dates = pd.to_datetime(df['date'], errors='coerce').dropna()
+            valid_dates = pd.to_datetime(df['date'], format='%Y-%m-%d', errors='coerce').dropna()
             if not valid_dates.empty:
                 summary_data.extend([
                     ['Date Range', 'Start', valid_dates.min().strftime('%Y-%m-%d')],
@@ -1237,12 +1351,13 @@ class UniversalPDFParser:
 
     def _create_data_types_sheet(self, writer, df: pd.DataFrame):
         """Create data types analysis sheet"""
-        data_types = []
-        for col in df.columns:
-            non_empty = df[col].astype(str).str.strip().ne('').sum()
-            data_types.append([col, non_empty, len(df) - non_empty])
-        
-        types_df = pd.DataFrame(data_types, columns=['Column', 'Non-Empty', 'Empty'])
+        # One frame-level pass instead of a Python loop over columns
+        non_empty = df.astype(str).apply(lambda s: s.str.strip()).ne('').sum()
+        types_df = pd.DataFrame({
+            'Column': non_empty.index,
+            'Non-Empty': non_empty.values,
+            'Empty': len(df) - non_empty.values,
+        })
         types_df.to_excel(writer, sheet_name='Data Types', index=False)
 
     def export_to_csv(self, data: List[Dict[str, Any]], filename: str = None) -> str:
@@ -1259,27 +1374,34 @@ class UniversalPDFParser:
         return filename
 
 def main():
-    """Test the parser"""
+    """Test the parser - parses every PDF given on the command line in parallel"""
+    import os
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
     parser = UniversalPDFParser()
-    
-    # Test with a sample PDF
-    pdf_path = "test.pdf"  # Replace with actual PDF path
-    
+    pdf_paths = sys.argv[1:] or ["test.pdf"]  # Replace with actual PDF path(s)
+
     try:
-        result = parser.parse_pdf_to_structured_data(pdf_path)
-        
-        if result['success']:
-            print(f"✅ Successfully parsed {result['total_lines']} lines")
-            
-            # Export to Excel and CSV
-            excel_file = parser.export_to_excel(result['structured_data'])
-            csv_file = parser.export_to_csv(result['structured_data'])
-            
-            print(f"✅ Excel exported: {excel_file}")
-            print(f"✅ CSV exported: {csv_file}")
-        else:
-            print(f"❌ Error: {result['error']}")
-            
+        # Files are independent and the heavy lifting happens in the PDF
+        # libraries' C code, so a thread pool keeps all cores busy
+        with ThreadPoolExecutor(max_workers=min(len(pdf_paths), os.cpu_count() or 2)) as ex:
+            results = list(ex.map(parser.parse_pdf_to_structured_data, pdf_paths))
+
+        for pdf_path, result in zip(pdf_paths, results):
+            if result['success']:
+                print(f"✅ {pdf_path}: successfully parsed {result['total_lines']} lines")
+
+                # Export to Excel and CSV, named after the source file
+                base = os.path.splitext(os.path.basename(pdf_path))[0]
+                excel_file = parser.export_to_excel(result['structured_data'], f"{base}_data.xlsx")
+                csv_file = parser.export_to_csv(result['structured_data'], f"{base}_data.csv")
+
+                print(f"✅ Excel exported: {excel_file}")
+                print(f"✅ CSV exported: {csv_file}")
+            else:
+                print(f"❌ {pdf_path}: {result['error']}")
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -12,8 +12,7 @@ setup(
         "regex==2023.8.8",
         "numpy==1.24.3",
         "python-dateutil==2.8.2",
-        "flask==2.3.2",
-        "flask-cors==4.0.0",
+        "flask[async]==2.3.2",
         "xlsxwriter==3.1.2",
         "python-dotenv==1.0.0",
         "gunicorn==20.1.0"
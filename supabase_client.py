@@ -0,0 +1,125 @@
+# Supabase (PostgREST) client for the PDF parser API
+# Requires SUPABASE_URL and SUPABASE_KEY environment variables
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+# Connection pool shared by every manager instance so concurrent requests
+# reuse keep-alive connections instead of paying a TLS handshake per call.
+# Limits are tunable via env to stay under Supabase's client cap.
+_POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv('SUPABASE_POOL_MAX', 10)),
+    max_keepalive_connections=int(os.getenv('SUPABASE_POOL_KEEPALIVE', 5)),
+    keepalive_expiry=float(os.getenv('SUPABASE_POOL_IDLE', 30)),
+)
+_session = httpx.Client(limits=_POOL_LIMITS, timeout=30.0)
+
+
+class SupabaseExpenseManager:
+    """Thin PostgREST client that stores parsed expense rows in Supabase."""
+
+    TABLE = 'expenses'
+    # PostgREST accepts bulk inserts; ~100 rows per request keeps payloads small
+    BATCH_SIZE = int(os.getenv('SUPABASE_BATCH_SIZE', 100))
+
+    def __init__(self):
+        self.url = os.environ['SUPABASE_URL'].rstrip('/')
+        self.key = os.environ['SUPABASE_KEY']
+        self.session = _session
+        self.session.headers.update({
+            'apikey': self.key,
+            'Authorization': f'Bearer {self.key}',
+            'Content-Type': 'application/json',
+        })
+
+    def _endpoint(self, table: str) -> str:
+        return f"{self.url}/rest/v1/{table}"
+
+    def save_expense(self, result: dict) -> dict:
+        """Save the structured rows from a single parse result."""
+        return self._insert_rows(result.get('structured_data') or [])
+
+    def save_multiple_expenses(self, results: list) -> dict:
+        """Save rows from many parse results with chunked bulk inserts.
+
+        All successful results are flattened into one row list and sent in
+        BATCH_SIZE chunks - one HTTP round-trip per chunk instead of per row.
+        """
+        rows = [
+            row
+            for r in results
+            if r.get('success')
+            for row in (r.get('structured_data') or [])
+        ]
+        return self._insert_rows(rows)
+
+    # How many chunk inserts may be in flight at once; keep below the
+    # connection pool size so PostgREST requests never queue on sockets
+    INSERT_CONCURRENCY = int(os.getenv('SUPABASE_INSERT_CONCURRENCY', 4))
+
+    def _post_chunk(self, chunk: list) -> None:
+        resp = self.session.post(
+            self._endpoint(self.TABLE),
+            json=chunk,
+            headers={'Prefer': 'return=minimal'},
+            timeout=30,
+        )
+        resp.raise_for_status()
+
+    def _insert_rows(self, rows: list) -> dict:
+        if not rows:
+            return {'success': True, 'inserted': 0}
+        chunks = [rows[start:start + self.BATCH_SIZE]
+                  for start in range(0, len(rows), self.BATCH_SIZE)]
+        if len(chunks) == 1:
+            self._post_chunk(chunks[0])
+        else:
+            # Overlap the HTTP round-trips: N chunks cost ~1 RTT instead of N
+            with ThreadPoolExecutor(max_workers=min(self.INSERT_CONCURRENCY,
+                                                    len(chunks))) as pool:
+                list(pool.map(self._post_chunk, chunks))
+        return {'success': True, 'inserted': len(rows)}
+
+    def get_expenses(self, limit: int = 100, offset: int = 0) -> dict:
+        resp = self.session.get(
+            self._endpoint(self.TABLE),
+            params={'limit': limit, 'offset': offset, 'order': 'id.desc'},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return {'success': True, 'expenses': resp.json()}
+
+    def get_expense_summary(self) -> dict:
+        resp = self.session.get(
+            self._endpoint(self.TABLE),
+            params={'select': 'amount'},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        amounts = [row.get('amount') or 0 for row in resp.json()]
+        return {
+            'success': True,
+            'total_count': len(amounts),
+            'total_amount': sum(amounts),
+        }
+
+    def update_expense(self, expense_id: int, data: dict) -> dict:
+        resp = self.session.patch(
+            self._endpoint(self.TABLE),
+            params={'id': f'eq.{expense_id}'},
+            json=data,
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return {'success': True}
+
+    def delete_expense(self, expense_id: int) -> dict:
+        resp = self.session.delete(
+            self._endpoint(self.TABLE),
+            params={'id': f'eq.{expense_id}'},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return {'success': True}
@@ -1 +0,0 @@
-from api_server import app as application